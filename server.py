@@ -1,25 +1,38 @@
 import asyncio
 import base64
+import codecs
+import collections
+import copy
+import functools
 import os
 import json
 import re
 import random
 import textwrap
 import io
-import subprocess
+import signal
 import shutil
+import sqlite3
+import threading
 import uuid
+import zlib
 import hashlib
+import heapq
+import itertools
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import timezone
+from email.utils import parsedate_to_datetime
 from html.parser import HTMLParser
 from html import unescape
 from urllib.parse import urlparse, parse_qs, urlunparse
 import httpx
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.responses import FileResponse, Response
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw, ImageFont, features
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
@@ -39,9 +52,135 @@ PWM_COMMAND = os.path.expanduser(os.getenv("PWM_COMMAND", "/home/ubuntu/.local/b
 PWM_PYTHON = os.path.expanduser(os.getenv("PWM_PYTHON", "/home/ubuntu/.local/share/pipx/venvs/perplexity-web-mcp-cli/bin/python"))
 PERPLEXITY_TOKEN_FILE = os.path.expanduser(os.getenv("PERPLEXITY_TOKEN_FILE", "~/.config/perplexity-web-mcp/token"))
 PERPLEXITY_SESSION_TURNS = int(os.getenv("PERPLEXITY_SESSION_TURNS", "4"))
+PERPLEXITY_SESSION_MAX_ENTRIES = int(os.getenv("PERPLEXITY_SESSION_MAX_ENTRIES", "256"))
+PERPLEXITY_SESSION_MAX_BYTES = int(os.getenv("PERPLEXITY_SESSION_MAX_BYTES", str(16 * 1024 * 1024)))
+PERPLEXITY_SESSION_TTL_SECONDS = float(os.getenv("PERPLEXITY_SESSION_TTL_SECONDS", "3600"))
+PERPLEXITY_SESSIONS_PER_CLIENT = int(os.getenv("PERPLEXITY_SESSIONS_PER_CLIENT", "32"))
+PWM_MAX_CONCURRENT = int(os.getenv("PWM_MAX_CONCURRENT", "2"))
+PWM_TIMEOUT_SECONDS = float(os.getenv("PWM_TIMEOUT_SECONDS", "90"))
+PWM_MAX_OUTPUT_BYTES = 8 * 1024 * 1024
+PWM_STDERR_TAIL_BYTES = 4096
+PERPLEXITY_WORKERS = int(os.getenv("PERPLEXITY_WORKERS", "1"))
+PERPLEXITY_WORKER_TIMEOUT_SECONDS = float(os.getenv("PERPLEXITY_WORKER_TIMEOUT_SECONDS", "90"))
+PERPLEXITY_WORKER_HEALTH_SECONDS = float(os.getenv("PERPLEXITY_WORKER_HEALTH_SECONDS", "60"))
+PERPLEXITY_WORKER_MAX_REQUESTS = int(os.getenv("PERPLEXITY_WORKER_MAX_REQUESTS", "200"))
 WATCH_INTERVAL_SECONDS = int(os.getenv("WATCH_INTERVAL_SECONDS", "45"))
 WATCH_TIMEOUT_SECONDS = int(os.getenv("WATCH_TIMEOUT_SECONDS", "12"))
+WATCH_MIN_INTERVAL_SECONDS = float(os.getenv("WATCH_MIN_INTERVAL_SECONDS", "15"))
+WATCH_MAX_INTERVAL_SECONDS = float(os.getenv("WATCH_MAX_INTERVAL_SECONDS", "900"))
+WATCH_BACKOFF_FACTOR = float(os.getenv("WATCH_BACKOFF_FACTOR", "1.5"))
+WATCH_TIGHTEN_FACTOR = float(os.getenv("WATCH_TIGHTEN_FACTOR", "0.25"))
 WATCH_RESEARCH_COOLDOWN_SECONDS = int(os.getenv("WATCH_RESEARCH_COOLDOWN_SECONDS", "900"))
+WATCH_HASH_MAX_CHARS = int(os.getenv("WATCH_HASH_MAX_CHARS", "1000000"))
+WATCH_TITLE_SCAN_CHARS = int(os.getenv("WATCH_TITLE_SCAN_CHARS", "131072"))
+WATCH_CHANGE_THRESHOLD = float(os.getenv("WATCH_CHANGE_THRESHOLD", "0.02"))
+WATCH_DIFF_MAX_BLOCKS = int(os.getenv("WATCH_DIFF_MAX_BLOCKS", "2048"))
+WATCH_TOKEN_MAX_CHARS = 4096
+WATCH_DIFF_BOUNDARY_MASK = 0x1F
+WATCH_DIFF_REPORT_BLOCKS = 8
+WATCH_STATE_DB = os.path.expanduser(os.getenv("WATCH_STATE_DB", "~/.omnilab/watch_state.db"))
+WATCH_STORE_FLUSH_SECONDS = float(os.getenv("WATCH_STORE_FLUSH_SECONDS", "5"))
+WATCH_STORE_RETENTION_DAYS = int(os.getenv("WATCH_STORE_RETENTION_DAYS", "14"))
+WATCH_MAX_CONCURRENT_FETCHES = int(os.getenv("WATCH_MAX_CONCURRENT_FETCHES", "8"))
+WATCH_JITTER_SECONDS = float(os.getenv("WATCH_JITTER_SECONDS", "5"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "120"))
+HTTP_ENABLE_HTTP2 = os.getenv("HTTP_ENABLE_HTTP2", "true").lower() not in {"0", "false", "no"}
+SEARCH_CACHE_TTL_SECONDS = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "900"))
+SEARCH_CACHE_MAX_BYTES = int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+SEARCH_HEDGE_ENABLED = os.getenv("SEARCH_HEDGE_ENABLED", "true").lower() not in {"0", "false", "no"}
+SEARCH_HEDGE_DELAY_SECONDS = float(os.getenv("SEARCH_HEDGE_DELAY_SECONDS", "25"))
+SEARCH_HEDGE_MIN_DELAY_SECONDS = float(os.getenv("SEARCH_HEDGE_MIN_DELAY_SECONDS", "3"))
+SEARCH_HEDGE_MAX_DELAY_SECONDS = float(os.getenv("SEARCH_HEDGE_MAX_DELAY_SECONDS", "60"))
+SEARCH_HEDGE_MIN_SAMPLES = 5
+RENDER_EXECUTOR = os.getenv("RENDER_EXECUTOR", "thread").lower()
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))
+RENDER_MAX_PENDING = int(os.getenv("RENDER_MAX_PENDING", "8"))
+RENDER_TIMEOUT_SECONDS = float(os.getenv("RENDER_TIMEOUT_SECONDS", "30"))
+ARTIFACT_STORE_DIR = os.path.expanduser(os.getenv("ARTIFACT_STORE_DIR", "~/.omnilab/artifacts"))
+ARTIFACT_STORE_MAX_BYTES = int(os.getenv("ARTIFACT_STORE_MAX_BYTES", str(256 * 1024 * 1024)))
+ARTIFACT_MIME_TYPES = {".jpg": "image/jpeg", ".webp": "image/webp", ".avif": "image/avif", ".png": "image/png"}
+# Preference order when a HUD client lists several image formats; AVIF is opt-in because it encodes slowly.
+IMAGE_FORMATS = [fmt.strip().lower() for fmt in os.getenv("IMAGE_FORMATS", "webp,jpeg").split(",") if fmt.strip()]
+IMAGE_PROFILES = {
+    "desktop": {
+        "max_width": int(os.getenv("IMAGE_DESKTOP_MAX_WIDTH", "1280")),
+        "max_height": int(os.getenv("IMAGE_DESKTOP_MAX_HEIGHT", "6000")),
+        "target_bytes": int(os.getenv("IMAGE_DESKTOP_TARGET_BYTES", "400000")),
+    },
+    "mobile": {
+        "max_width": int(os.getenv("IMAGE_MOBILE_MAX_WIDTH", "720")),
+        "max_height": int(os.getenv("IMAGE_MOBILE_MAX_HEIGHT", "3000")),
+        "target_bytes": int(os.getenv("IMAGE_MOBILE_TARGET_BYTES", "150000")),
+    },
+}
+IMAGE_MIN_QUALITY = int(os.getenv("IMAGE_MIN_QUALITY", "40"))
+IMAGE_MAX_QUALITY = int(os.getenv("IMAGE_MAX_QUALITY", "85"))
+IMAGE_PREVIEW_WIDTH = int(os.getenv("IMAGE_PREVIEW_WIDTH", "320"))
+IMAGE_PREVIEW_QUALITY = 35
+RESULT_FORMATS = {"image", "structured"}
+BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "2"))
+BROWSER_PROFILE_MAX_TABS = int(os.getenv("BROWSER_PROFILE_MAX_TABS", "2"))
+BROWSER_PAGE_MAX_USES = int(os.getenv("BROWSER_PAGE_MAX_USES", "20"))
+BROWSER_PAGE_MAX_AGE_SECONDS = float(os.getenv("BROWSER_PAGE_MAX_AGE_SECONDS", "600"))
+BROWSER_PREWARM = os.getenv("BROWSER_PREWARM", "true").lower() not in {"0", "false", "no"}
+# Upper bounds on waiting for a page to finish; the capture normally proceeds as soon as readiness is detected.
+BROWSER_READY_TIMEOUTS = {
+    "gemini": float(os.getenv("BROWSER_READY_TIMEOUT_GEMINI", "45")),
+    "chatgpt": float(os.getenv("BROWSER_READY_TIMEOUT_CHATGPT", "45")),
+    "perplexity": float(os.getenv("BROWSER_READY_TIMEOUT_PERPLEXITY", "30")),
+    "default": float(os.getenv("BROWSER_READY_TIMEOUT_SECONDS", "10")),
+}
+BROWSER_READY_QUIET_MS = int(os.getenv("BROWSER_READY_QUIET_MS", "1500"))
+# Screenshot mode: auto (answer clip for chat engines, tiles elsewhere), full, clip, viewports or tiles.
+BROWSER_CAPTURE_MODE = os.getenv("BROWSER_CAPTURE_MODE", "auto").lower()
+if BROWSER_CAPTURE_MODE not in {"auto", "full", "clip", "viewports", "tiles"}:
+    BROWSER_CAPTURE_MODE = "auto"
+BROWSER_CAPTURE_MAX_VIEWPORTS = int(os.getenv("BROWSER_CAPTURE_MAX_VIEWPORTS", "4"))
+BROWSER_CAPTURE_TILE_VIEWPORTS = int(os.getenv("BROWSER_CAPTURE_TILE_VIEWPORTS", "2"))
+BROWSER_CAPTURE_MAX_TILES = int(os.getenv("BROWSER_CAPTURE_MAX_TILES", "4"))
+BROWSER_CAPTURE_BUDGET_SECONDS = float(os.getenv("BROWSER_CAPTURE_BUDGET_SECONDS", "8"))
+BROWSER_BLOCKING_ENABLED = os.getenv("BROWSER_BLOCKING_ENABLED", "true").lower() not in {"0", "false", "no"}
+BROWSER_BLOCK_TYPES = {t.strip() for t in os.getenv("BROWSER_BLOCK_TYPES", "media,font,texttrack,manifest").split(",") if t.strip()}
+BROWSER_TRACKER_DOMAINS = {
+    "doubleclick.net", "googlesyndication.com", "googleadservices.com", "google-analytics.com",
+    "googletagmanager.com", "adservice.google.com", "scorecardresearch.com", "analytics.yahoo.com",
+    "ads.yahoo.com", "advertising.com", "facebook.net", "criteo.com", "criteo.net", "taboola.com",
+    "outbrain.com", "amazon-adsystem.com", "bat.bing.com", "hotjar.com", "browser-intake-datadoghq.com",
+} | {d.strip().lower() for d in os.getenv("BROWSER_BLOCK_DOMAINS", "").split(",") if d.strip()}
+# Never blocked, whatever the resource type: Google's icon fonts are drawn as ligatures and break without them.
+BROWSER_ALLOW_DOMAINS = {d.strip().lower() for d in os.getenv("BROWSER_ALLOW_DOMAINS", "fonts.gstatic.com").split(",") if d.strip()}
+BROWSER_TRACKER_URL_PATTERNS = [
+    pattern
+    for domain in sorted(BROWSER_TRACKER_DOMAINS - BROWSER_ALLOW_DOMAINS)
+    for pattern in (f"*://{domain}/*", f"*://*.{domain}/*")
+]
+# Resource types dropped per engine. Tracker domains are blocked for every engine through CDP, which keeps the
+# HTTP cache; dropping types needs request routing, which disables it, so chat engines (whose multi-MB app
+# bundles should stay cached) are not routed at all.
+BROWSER_RESOURCE_POLICIES = {
+    "gemini": set(),
+    "chatgpt": set(),
+    "perplexity": set(),
+    "default": BROWSER_BLOCK_TYPES,
+}
+# Engines that need the logged-in Chromium profile; google/web move to a proxied context when SEARCH_PROXY_FILE is set.
+BROWSER_PROFILE_ENGINES = {"google", "web", "gemini", "chatgpt", "perplexity"}
+BROWSER_PROXY_ENGINES = {"google", "web"}
+BROWSER_ARGS = ["--no-sandbox", "--disable-blink-features=AutomationControlled"]
+BROWSER_CONTEXT_OPTIONS = {
+    "user_agent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
+    "locale": 'pt-BR',
+    "timezone_id": 'America/Sao_Paulo',
+    "geolocation": {'latitude': -23.5505, 'longitude': -46.6333},
+    "permissions": ['geolocation'],
+    "viewport": {'width': 1280, 'height': 800},
+}
+RESEARCH_WORKERS = int(os.getenv("RESEARCH_WORKERS", "2"))
+RESEARCH_QUEUE_MAX_DEPTH = int(os.getenv("RESEARCH_QUEUE_MAX_DEPTH", "32"))
+RESEARCH_PRIORITY_INTERACTIVE = 0
+RESEARCH_PRIORITY_WATCH = 10
 COOKIE_FILE_CANDIDATES = [
     COOKIE_FILE,
     os.path.expanduser("~/arq.json"),
@@ -70,7 +209,25 @@ BOT_CHECK_PATTERNS = [
     "captcha",
 ]
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await watch_store.open()
+    await artifact_store.open()
+    research_queue.start()
+    await perplexity_workers.start()
+    render_pool.start()
+    browser_pool.start()
+    watch_scheduler.start()
+    yield
+    await watch_scheduler.stop()
+    await research_queue.stop()
+    await perplexity_workers.stop()
+    render_pool.stop()
+    await browser_pool.stop()
+    await watch_store.close()
+    await http_clients.aclose()
+
+app = FastAPI(lifespan=lifespan)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 @app.get("/")
@@ -79,10 +236,70 @@ async def root(): return FileResponse("static/index.html")
 @app.head("/")
 async def root_head(): return Response(status_code=200)
 
+@app.get("/artifacts/{artifact_id}")
+async def get_artifact(artifact_id: str, request: Request):
+    entry = artifact_store.get(artifact_id)
+    if entry is None:
+        return Response(status_code=404)
+    headers = {"ETag": f'"{artifact_id}"', "Cache-Control": "public, max-age=31536000, immutable"}
+    if f'"{artifact_id}"' in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(entry["path"], media_type=entry["mime"], headers=headers)
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "http_pool": http_clients.snapshot(),
+        "watch_scheduler": watch_scheduler.snapshot(),
+        "watch_store": watch_store.snapshot(),
+        "research_queue": research_queue.snapshot(),
+        "search_cache": search_cache.snapshot(),
+        "search_providers": provider_race.snapshot(),
+        "perplexity_workers": perplexity_workers.snapshot(),
+        "research_progress": research_progress.stats,
+        "perplexity_sessions": perplexity_sessions.snapshot(),
+        "render_pool": render_pool.snapshot(),
+        "artifact_store": artifact_store.snapshot(),
+        "browser_pool": browser_pool.snapshot(),
+        "browser_readiness": {
+            engine: {**browser_ready_stats[engine], "ready_ms": window.snapshot()}
+            for engine, window in browser_ready_ms.items()
+        },
+        "browser_capture": {
+            mode: {**stats, "capture_ms": browser_capture_ms[mode].snapshot()}
+            for mode, stats in browser_capture_stats.items()
+        },
+        "browser_traffic": {
+            engine: {**stats, "load_ms": browser_load_ms[engine].snapshot(), "transfer_bytes": browser_transfer_bytes[engine].snapshot()}
+            for engine, stats in browser_traffic_stats.items()
+        },
+        "image_encoding": {
+            "profiles": dict(image_encode_stats),
+            "encode_ms": {fmt: window.snapshot() for fmt, window in image_encode_ms.items()},
+        },
+        "pwm_cli": {**pwm_stats, "max_concurrent": PWM_MAX_CONCURRENT},
+    }
+
 cognitive_memory = []
 hud_connections: set[WebSocket] = set()
-perplexity_sessions = {}
-watch_tasks: dict[WebSocket, asyncio.Task] = {}
+
+class HudClient:
+    """Capabilities a HUD socket negotiated with its hello message."""
+
+    def __init__(self):
+        self.binary_frames = False
+        self.artifact_urls = False
+        self.image_profile: dict | None = None
+        # Keeps each binary-frame JSON header adjacent to its bytes frame when several tasks send images.
+        self.send_lock = asyncio.Lock()
+
+hud_clients: dict[WebSocket, HudClient] = {}
+
+def hud_client_id(value) -> str | None:
+    """Validates the stable id a HUD keeps in localStorage, so its sessions outlive any single socket."""
+    if isinstance(value, str) and re.fullmatch(r"[0-9a-fA-F-]{8,36}", value):
+        return value.lower()
+    return None
 
 class AnalyzeRequest(BaseModel):
     image: str
@@ -94,6 +311,140 @@ async def send_ws_json(ws: WebSocket, payload: dict) -> bool:
     except (WebSocketDisconnect, RuntimeError):
         return False
 
+async def send_ws_image(ws: WebSocket, image: bytes | str, mime: str = "image/jpeg", meta: dict | None = None) -> bool:
+    """Sends a browser_screenshot as an artifact reference, a JSON header plus raw bytes frame, or base64 JSON.
+
+    The first form the socket negotiated wins; sockets that never sent a hello get base64 JSON.
+    """
+    client = hud_clients.get(ws)
+    try:
+        if client is None or not (client.binary_frames or client.artifact_urls):
+            data = image if isinstance(image, str) else base64.b64encode(image).decode("utf-8")
+            await ws.send_json({"type": "browser_screenshot", "data": data})
+            return True
+        raw = base64.b64decode(image) if isinstance(image, str) else image
+        if client.artifact_urls and artifact_store.enabled:
+            artifact_id = await artifact_store.put(raw, mime)
+            await ws.send_json({
+                "type": "browser_screenshot",
+                "artifact_id": artifact_id,
+                "url": f"/artifacts/{artifact_id}",
+                "mime": mime,
+                "size": len(raw),
+                **(meta or {}),
+            })
+            return True
+        if not client.binary_frames:
+            await ws.send_json({"type": "browser_screenshot", "data": base64.b64encode(raw).decode("utf-8"), "mime": mime, **(meta or {})})
+            return True
+        async with client.send_lock:
+            await ws.send_json({"type": "browser_screenshot", "binary": True, "mime": mime, "size": len(raw), **(meta or {})})
+            await ws.send_bytes(raw)
+        return True
+    except (WebSocketDisconnect, RuntimeError):
+        return False
+
+def http2_supported() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+class LatencyWindow:
+    """Keeps the most recent samples so /metrics can report percentiles without unbounded growth."""
+
+    def __init__(self, size: int = 256):
+        self._samples: collections.deque[float] = collections.deque(maxlen=size)
+        self.count = 0
+
+    def add(self, value_ms: float):
+        self._samples.append(value_ms)
+        self.count += 1
+
+    def percentile(self, pct: float) -> float | None:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+    def snapshot(self) -> dict:
+        if not self._samples:
+            return {"count": self.count}
+        return {
+            "count": self.count,
+            "p50": round(self.percentile(0.5), 1),
+            "p95": round(self.percentile(0.95), 1),
+            "max": round(max(self._samples), 1),
+        }
+
+class HttpClientRegistry:
+    """One pooled AsyncClient shared by every upstream call so keep-alive connections survive between calls.
+
+    httpx keeps a connection pool per origin inside a single client, so hundreds of watched hosts share one SSL
+    context and one set of limits instead of a client each. A request that opens a new connection counts as a
+    pool miss; one served on a kept-alive connection counts as a hit.
+    """
+
+    def __init__(self):
+        self._client: httpx.AsyncClient | None = None
+        self._http2 = HTTP_ENABLE_HTTP2 and http2_supported()
+        self.stats = {
+            "requests": 0,
+            "hits": 0,
+            "misses": 0,
+            "connections_opened": 0,
+            "tls_handshakes": 0,
+        }
+
+    def get(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=self._http2,
+                limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SECONDS,
+                ),
+                event_hooks={"request": [self._on_request], "response": [self._on_response]},
+            )
+        return self._client
+
+    async def _on_request(self, request: httpx.Request):
+        self.stats["requests"] += 1
+        opened = request.extensions["omnilab_connected"] = []
+
+        async def trace(event_name: str, info: dict):
+            if event_name == "connection.connect_tcp.complete":
+                self.stats["connections_opened"] += 1
+                opened.append(True)
+            elif event_name == "connection.start_tls.complete":
+                self.stats["tls_handshakes"] += 1
+
+        request.extensions["trace"] = trace
+
+    async def _on_response(self, response: httpx.Response):
+        self.stats["misses" if response.request.extensions.get("omnilab_connected") else "hits"] += 1
+
+    async def aclose(self):
+        http, self._client = self._client, None
+        if http is not None:
+            try:
+                await http.aclose()
+            except Exception as e:
+                print(f"⚠️ [HTTP] Could not close pooled client: {e}")
+
+    def snapshot(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else None,
+            "max_connections": HTTP_MAX_CONNECTIONS,
+            "http2": self._http2,
+        }
+
+http_clients = HttpClientRegistry()
+
 def page_has_bot_check(content: str, url: str) -> bool:
     haystack = f"{url}\n{content}".lower()
     return any(pattern in haystack for pattern in BOT_CHECK_PATTERNS)
@@ -117,9 +468,150 @@ def extract_page_title(html: str) -> str:
         return ""
     return re.sub(r"\s+", " ", unescape(match.group(1))).strip()[:140]
 
+class StreamingPageDigest:
+    """Hashes whitespace-normalized page text chunk by chunk and keeps only the head needed for the title.
+
+    Alongside the exact hash it cuts the token stream into content-defined blocks (a block ends where a
+    token's CRC hits the boundary mask), so an edit only changes the blocks it touches. The resulting
+    (crc, length, preview) triples are the compact shingle fingerprint used by diff_fingerprints. A token
+    cut by a chunk boundary is held back until the next chunk, so the blocks do not depend on how the
+    network split the body, and past WATCH_DIFF_MAX_BLOCKS the rest of the page folds into the last block.
+    """
+
+    def __init__(self, encoding: str | None, max_chars: int = WATCH_HASH_MAX_CHARS):
+        try:
+            self._decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+        except LookupError:
+            self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._hash = hashlib.sha256()
+        self._remaining = max_chars
+        self._pending_space = False
+        self._started = False
+        self._tail = ""
+        self._head = ""
+        self._title_done = False
+        self._block_crc = 0
+        self._block_length = 0
+        self._block_tokens = 0
+        self._block_preview: list[str] = []
+        self.blocks: list[tuple[int, int, str]] = []
+        self.content_length = 0
+
+    def update(self, chunk: bytes, final: bool = False):
+        self.content_length += len(chunk)
+        if self._remaining <= 0 and self._title_done and not final:
+            return
+        text = self._decoder.decode(chunk, final)
+        if not self._title_done:
+            scan_from = max(0, len(self._head) - len("</title>"))
+            self._head = (self._head + text)[:WATCH_TITLE_SCAN_CHARS]
+            if len(self._head) >= WATCH_TITLE_SCAN_CHARS or "</title>" in self._head[scan_from:].lower():
+                self._title_done = True
+        if self._remaining <= 0:
+            if final:
+                self._flush_tail()
+            return
+        text = text[:self._remaining]
+        self._remaining -= len(text)
+        text = self._tail + text
+        self._tail = ""
+        if not final and self._remaining > 0 and text and not text[-1].isspace():
+            # Runs are tokenized in WATCH_TOKEN_MAX_CHARS pieces from their start, so only the unfinished
+            # last piece has to wait for the next chunk. rsplit walks back from the end once, where a
+            # "\S+$" search would rescan the run from every start position.
+            run = len(text.rsplit(None, 1)[-1])
+            cut = len(text) - run + (run // WATCH_TOKEN_MAX_CHARS) * WATCH_TOKEN_MAX_CHARS
+            text, self._tail = text[:cut], text[cut:]
+        self._add_text(text)
+        if final:
+            self._close_block()
+
+    def _flush_tail(self):
+        text, self._tail = self._tail, ""
+        self._add_text(text)
+        self._close_block()
+
+    def _add_text(self, text: str):
+        for token in re.findall(r"\s+|\S{1,%d}" % WATCH_TOKEN_MAX_CHARS, text):
+            if token.isspace():
+                self._pending_space = self._started
+                continue
+            if self._pending_space:
+                self._hash.update(b" ")
+                self._pending_space = False
+            encoded = token.encode("utf-8", errors="ignore")
+            self._hash.update(encoded)
+            self._started = True
+            self._add_block_token(token, encoded)
+
+    def _add_block_token(self, token: str, encoded: bytes):
+        self._block_crc = zlib.crc32(encoded, self._block_crc)
+        self._block_length += len(encoded) + 1
+        self._block_tokens += 1
+        if self._block_tokens <= 12:
+            self._block_preview.append(token)
+        if len(self.blocks) >= WATCH_DIFF_MAX_BLOCKS - 1:
+            return
+        if zlib.crc32(encoded) & WATCH_DIFF_BOUNDARY_MASK == 0 or self._block_tokens >= 256:
+            self._close_block()
+
+    def _close_block(self):
+        if self._block_tokens:
+            preview = " ".join(self._block_preview)[:80]
+            self.blocks.append((self._block_crc, self._block_length, preview))
+        self._block_crc = 0
+        self._block_length = 0
+        self._block_tokens = 0
+        self._block_preview = []
+
+    @property
+    def title(self) -> str:
+        return extract_page_title(self._head)
+
+    @property
+    def content_hash(self) -> str:
+        return self._hash.hexdigest()[:16]
+
+def page_fingerprint(text: str, max_chars: int = WATCH_HASH_MAX_CHARS) -> str:
+    """One-shot content hash of decoded page text; StreamingPageDigest yields the same value chunk by chunk."""
+    return hashlib.sha256(" ".join(text[:max_chars].split()).encode("utf-8", errors="ignore")).hexdigest()[:16]
+
+def diff_fingerprints(previous: list[tuple[int, int, str]] | None, current: list[tuple[int, int, str]] | None) -> dict | None:
+    if previous is None or current is None:
+        return None
+    previous_weights: dict[int, int] = {}
+    for crc, length, _ in previous:
+        previous_weights[crc] = previous_weights.get(crc, 0) + length
+    current_weights: dict[int, int] = {}
+    for crc, length, _ in current:
+        current_weights[crc] = current_weights.get(crc, 0) + length
+    shared = sum(min(weight, previous_weights.get(crc, 0)) for crc, weight in current_weights.items())
+    total = sum(previous_weights.values()) + sum(current_weights.values()) - shared
+    changed = [
+        {"index": idx, "preview": preview}
+        for idx, (crc, _, preview) in enumerate(current)
+        if crc not in previous_weights
+    ]
+    return {
+        "similarity": round(shared / total, 4) if total else 1.0,
+        "changed_blocks": changed[:WATCH_DIFF_REPORT_BLOCKS],
+        "changed_block_count": len(changed),
+        "removed_block_count": sum(1 for crc, _, _ in previous if crc not in current_weights),
+    }
+
+def is_significant_change(previous: dict, current: dict) -> bool:
+    if previous.get("status_code") != current.get("status_code"):
+        return True
+    if previous.get("title") != current.get("title") and current.get("title"):
+        return True
+    similarity = current.get("similarity")
+    return similarity is None or 1 - similarity >= WATCH_CHANGE_THRESHOLD
+
 def summarize_change(previous: dict | None, current: dict) -> str:
     if not previous:
         return "BASELINE_CAPTURED"
+    if current.get("not_modified"):
+        return "NO_CHANGE"
     changes = []
     if previous.get("status_code") != current.get("status_code"):
         changes.append(f"STATUS {previous.get('status_code')}->{current.get('status_code')}")
@@ -127,133 +619,507 @@ def summarize_change(previous: dict | None, current: dict) -> str:
         changes.append("TITLE_CHANGED")
     if previous.get("content_hash") != current.get("content_hash"):
         delta = current.get("content_length", 0) - previous.get("content_length", 0)
-        changes.append(f"CONTENT_CHANGED ({delta:+d} bytes)")
+        if current.get("similarity") is not None:
+            changes.append(f"CONTENT_CHANGED ({delta:+d} bytes, {current['similarity']:.1%} similar, {current.get('changed_block_count', 0)} blocks)")
+        else:
+            changes.append(f"CONTENT_CHANGED ({delta:+d} bytes)")
     return " // ".join(changes) if changes else "NO_CHANGE"
 
-async def fetch_watch_snapshot(target: str) -> dict:
+def parse_max_age(cache_control: str | None) -> float | None:
+    if not cache_control or re.search(r"no-cache|no-store", cache_control, re.I):
+        return None
+    match = re.search(r"(?:^|[,\s])max-age=\"?(\d+)", cache_control, re.I)
+    return float(match.group(1)) if match else None
+
+def parse_retry_after(value: str | None) -> float | None:
+    value = (value or "").strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, retry_at.timestamp() - time.time())
+
+def next_watch_interval(interval: float, previous: dict | None, current: dict, significant: bool, max_age: float | None, retry_after: float | None) -> float:
+    if significant:
+        interval *= WATCH_TIGHTEN_FACTOR
+    elif previous and current.get("ok"):
+        interval *= WATCH_BACKOFF_FACTOR
+    floor = max(max_age or 0.0, retry_after or 0.0)
+    return min(WATCH_MAX_INTERVAL_SECONDS, max(WATCH_MIN_INTERVAL_SECONDS, interval, floor))
+
+async def fetch_watch_snapshot(target: str, previous: dict | None = None) -> dict:
     headers = {
         "User-Agent": "OmniLab-Watchtower/1.0 (+https://github.com/EngThi/OmniLab)",
         "Accept": "text/html,application/xhtml+xml,application/json,text/plain;q=0.9,*/*;q=0.8",
     }
+    if previous and previous.get("ok"):
+        if previous.get("etag"):
+            headers["If-None-Match"] = previous["etag"]
+        if previous.get("last_modified"):
+            headers["If-Modified-Since"] = previous["last_modified"]
     started = time.perf_counter()
-    async with httpx.AsyncClient(timeout=WATCH_TIMEOUT_SECONDS, follow_redirects=True) as http:
-        response = await http.get(target, headers=headers)
+    http = http_clients.get()
+    async with http.stream("GET", target, headers=headers, timeout=WATCH_TIMEOUT_SECONDS, follow_redirects=True) as response:
+        if response.status_code == 304 and previous:
+            return {
+                **previous,
+                "url": str(response.url),
+                "elapsed_ms": int((time.perf_counter() - started) * 1000),
+                "etag": response.headers.get("etag") or previous.get("etag"),
+                "last_modified": response.headers.get("last-modified") or previous.get("last_modified"),
+                "not_modified": True,
+                "max_age": parse_max_age(response.headers.get("cache-control")),
+                "retry_after": parse_retry_after(response.headers.get("retry-after")),
+                "checked_at": int(time.time()),
+            }
+        digest = StreamingPageDigest(response.encoding)
+        async for chunk in response.aiter_bytes():
+            digest.update(chunk)
+        digest.update(b"", final=True)
     elapsed_ms = int((time.perf_counter() - started) * 1000)
-    text = response.text[:1_000_000]
-    normalized_text = re.sub(r"\s+", " ", text).strip()
     return {
         "url": str(response.url),
         "status_code": response.status_code,
         "ok": 200 <= response.status_code < 400,
         "elapsed_ms": elapsed_ms,
-        "title": extract_page_title(text),
-        "content_length": len(response.content),
-        "content_hash": hashlib.sha256(normalized_text.encode("utf-8", errors="ignore")).hexdigest()[:16],
+        "title": digest.title,
+        "content_length": digest.content_length,
+        "content_hash": digest.content_hash,
+        "fingerprint": digest.blocks,
+        "etag": response.headers.get("etag"),
+        "last_modified": response.headers.get("last-modified"),
+        "not_modified": False,
+        "max_age": parse_max_age(response.headers.get("cache-control")),
+        "retry_after": parse_retry_after(response.headers.get("retry-after")),
         "checked_at": int(time.time()),
     }
 
-async def watch_target_loop(ws: WebSocket, target: str):
-    previous = None
-    baseline_reported = False
-    last_researched_signature = None
-    last_research_at = 0
-    await send_ws_json(ws, {"type": "watch_update", "status": "started", "target": target, "message": f"WATCHING {target}"})
-    while True:
+class WatchStateStore:
+    """SQLite (WAL) store for Watchtower snapshots, cooldowns and last reports.
+
+    The scheduler only marks targets dirty; a background task flushes them in one transaction every
+    WATCH_STORE_FLUSH_SECONDS from a worker thread, so polling never waits on disk.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.states: dict[str, dict] = {}
+        self._db: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._dirty: dict[str, dict] = {}
+        self._reports: dict[str, dict] = {}
+        self._deleted: set[str] = set()
+        self._flusher: asyncio.Task | None = None
+        self.stats = {"restored": 0, "flushes": 0, "rows_written": 0, "errors": 0}
+
+    async def open(self):
+        if not self.path:
+            return
         try:
-            current = await fetch_watch_snapshot(target)
-            summary = summarize_change(previous, current)
-            current["change"] = summary
-            current["target"] = target
-            current["status"] = "changed" if previous and summary != "NO_CHANGE" else "ok"
-            if not await send_ws_json(ws, {"type": "watch_update", **current}):
-                return
-            should_research = False
-            reason = ""
-            if not baseline_reported:
-                should_research = True
-                reason = "baseline"
-                baseline_reported = True
-            elif previous and summary != "NO_CHANGE":
-                should_research = True
-                reason = "change"
-            elif not current.get("ok"):
-                should_research = True
-                reason = "availability"
-
-            signature = f"{reason}:{current.get('status_code')}:{current.get('content_hash')}:{current.get('title')}"
-            if should_research and signature != last_researched_signature:
-                now = time.time()
-                if baseline_reported and reason != "baseline" and now - last_research_at < WATCH_RESEARCH_COOLDOWN_SECONDS:
-                    await send_ws_json(ws, {
-                        "type": "status_update",
-                        "message": f"WORKFLOW: CHANGE_DETECTED_REPORT_COOLDOWN {WATCH_RESEARCH_COOLDOWN_SECONDS}s",
-                    })
-                    previous = current
-                    await asyncio.sleep(WATCH_INTERVAL_SECONDS)
-                    continue
-                last_researched_signature = signature
-                last_research_at = now
-                workflow_query = (
-                    f"URL monitor workflow report for {target}. "
-                    f"Current status: HTTP {current.get('status_code')} in {current.get('elapsed_ms')}ms. "
-                    f"Title: {current.get('title') or 'unknown'}. "
-                    f"Detected reason: {reason}; change summary: {summary}. "
-                    "Research this URL and produce a practical monitoring report: what changed or matters, "
-                    "why a user should care, and recommended next actions. Include sources."
-                )
-                await send_ws_json(ws, {
-                    "type": "watch_artifact_start",
-                    "target": target,
-                    "query": workflow_query,
-                    "reason": reason,
-                })
-                await send_ws_json(ws, {
-                    "type": "status_update",
-                    "message": f"WORKFLOW: AUTO_RESEARCH_{reason.upper()}",
-                })
+            await asyncio.to_thread(self._open_sync)
+        except Exception as e:
+            print(f"⚠️ [WatchStore] Could not open {self.path}: {e}")
+            return
+        self._flusher = asyncio.create_task(self._flush_loop())
+        print(f"✅ [WatchStore] Restored {len(self.states)} watch targets from {self.path}")
+
+    def _open_sync(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("CREATE TABLE IF NOT EXISTS watch_state (url TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at INTEGER NOT NULL)")
+        db.execute("CREATE TABLE IF NOT EXISTS watch_report (url TEXT PRIMARY KEY, report TEXT NOT NULL, updated_at INTEGER NOT NULL)")
+        cutoff = int(time.time()) - WATCH_STORE_RETENTION_DAYS * 86400
+        db.execute("DELETE FROM watch_state WHERE updated_at < ?", (cutoff,))
+        db.execute("DELETE FROM watch_report WHERE updated_at < ?", (cutoff,))
+        db.commit()
+        for url, state in db.execute("SELECT url, state FROM watch_state"):
+            try:
+                self.states[url] = json.loads(state)
+            except ValueError:
+                continue
+        self.stats["restored"] = len(self.states)
+        self._db = db
+
+    async def close(self):
+        if self._flusher:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        if self._db is not None:
+            await self.flush()
+            with self._lock:
+                self._db.close()
+            self._db = None
+
+    def save(self, url: str, state: dict):
+        self.states[url] = state
+        self._dirty[url] = state
+        self._deleted.discard(url)
+
+    def save_report(self, url: str, report: dict):
+        self._reports[url] = report
+
+    def forget(self, url: str):
+        self.states.pop(url, None)
+        self._dirty.pop(url, None)
+        self._reports.pop(url, None)
+        self._deleted.add(url)
+
+    async def load_report(self, url: str) -> dict | None:
+        if url in self._reports:
+            return self._reports[url]
+        if self._db is None:
+            return None
+        try:
+            return await asyncio.to_thread(self._load_report_sync, url)
+        except Exception as e:
+            print(f"⚠️ [WatchStore] Could not load report for {url}: {e}")
+            return None
+
+    def _load_report_sync(self, url: str) -> dict | None:
+        with self._lock:
+            row = self._db.execute("SELECT report FROM watch_report WHERE url = ?", (url,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(WATCH_STORE_FLUSH_SECONDS)
+            await self.flush()
+
+    async def flush(self):
+        if self._db is None or not (self._dirty or self._reports or self._deleted):
+            return
+        states, self._dirty = self._dirty, {}
+        reports, self._reports = self._reports, {}
+        deleted, self._deleted = self._deleted, set()
+        try:
+            await asyncio.to_thread(self._flush_sync, states, reports, deleted)
+            self.stats["flushes"] += 1
+            self.stats["rows_written"] += len(states) + len(reports) + len(deleted)
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"⚠️ [WatchStore] Flush failed: {e}")
+            for url, state in states.items():
+                self._dirty.setdefault(url, state)
+            for url, report in reports.items():
+                self._reports.setdefault(url, report)
+            self._deleted |= deleted - self._dirty.keys()
+
+    def _flush_sync(self, states: dict[str, dict], reports: dict[str, dict], deleted: set[str]):
+        now = int(time.time())
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO watch_state (url, state, updated_at) VALUES (?, ?, ?)",
+                [(url, json.dumps(state, ensure_ascii=False), now) for url, state in states.items()],
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO watch_report (url, report, updated_at) VALUES (?, ?, ?)",
+                [(url, json.dumps(report, ensure_ascii=False), now) for url, report in reports.items()],
+            )
+            self._db.executemany("DELETE FROM watch_state WHERE url = ?", [(url,) for url in deleted])
+            self._db.executemany("DELETE FROM watch_report WHERE url = ?", [(url,) for url in deleted])
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "enabled": self._db is not None,
+            "pending": len(self._dirty) + len(self._reports) + len(self._deleted),
+        }
+
+watch_store = WatchStateStore(WATCH_STATE_DB)
+
+class WatchTarget:
+    def __init__(self, url: str):
+        self.url = url
+        self.subscribers: set[WebSocket] = set()
+        self.previous: dict | None = None
+        self.baseline_reported = False
+        self.last_researched_signature = None
+        self.last_research_at = 0
+        self.last_report: dict | None = None
+        # Fingerprint and hash of the content last reported on; polls are diffed against these, not the
+        # previous poll, so slow drift still adds up to a report.
+        self.fingerprint: list[tuple[int, int, str]] | None = None
+        self.fingerprint_hash: str | None = None
+        # The previous poll's fingerprint drives the polling interval, so a change held back by the research
+        # cooldown only tightens polling once instead of on every poll until it is reported.
+        self.last_fingerprint: list[tuple[int, int, str]] | None = None
+        self.cooldown_signature = None
+        self.research_task: asyncio.Task | None = None
+        self.due_at = 0.0
+        self.interval = float(WATCH_INTERVAL_SECONDS)
+
+    def to_state(self) -> dict:
+        return {
+            "previous": self.previous,
+            "fingerprint": self.fingerprint,
+            "fingerprint_hash": self.fingerprint_hash,
+            "baseline_reported": self.baseline_reported,
+            "last_researched_signature": self.last_researched_signature,
+            "last_research_at": self.last_research_at,
+            "interval": self.interval,
+        }
+
+    def restore(self, state: dict):
+        self.previous = state.get("previous")
+        fingerprint = state.get("fingerprint")
+        self.fingerprint = [tuple(block) for block in fingerprint] if fingerprint is not None else None
+        self.fingerprint_hash = state.get("fingerprint_hash")
+        self.baseline_reported = bool(state.get("baseline_reported"))
+        self.last_researched_signature = state.get("last_researched_signature")
+        self.last_research_at = state.get("last_research_at") or 0
+        self.interval = float(state.get("interval") or WATCH_INTERVAL_SECONDS)
+
+class WatchScheduler:
+    """Polls every unique watch target once per interval and fans the result out to all subscribed sockets."""
+
+    def __init__(self):
+        self.targets: dict[str, WatchTarget] = {}
+        self.subscriptions: dict[WebSocket, str] = {}
+        self._heap: list[tuple[float, int, str]] = []
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(WATCH_MAX_CONCURRENT_FETCHES)
+        self._runner: asyncio.Task | None = None
+        self._polls: set[asyncio.Task] = set()
+        self.stats = {"polls": 0, "errors": 0, "late_ms_max": 0}
+
+    def start(self):
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.create_task(self._run())
+
+    async def stop(self):
+        tasks = [self._runner, *self._polls, *(t.research_task for t in self.targets.values())]
+        for task in tasks:
+            if task and not task.done():
+                task.cancel()
+        await asyncio.gather(*(t for t in tasks if t), return_exceptions=True)
+        self._runner = None
+
+    async def subscribe(self, ws: WebSocket, url: str):
+        self.start()
+        target = self.targets.get(url)
+        if target is None:
+            target = self.targets[url] = WatchTarget(url)
+            state = watch_store.states.get(url)
+            if state:
+                target.restore(state)
+                target.last_report = await watch_store.load_report(url)
+            self._schedule(target, random.uniform(0, min(WATCH_JITTER_SECONDS, WATCH_INTERVAL_SECONDS)))
+        target.subscribers.add(ws)
+        self.subscriptions[ws] = url
+        await send_ws_json(ws, {"type": "watch_update", "status": "started", "target": url, "message": f"WATCHING {url}"})
+        if target.previous:
+            await send_ws_json(ws, {"type": "watch_update", **target.previous})
+        if target.last_report:
+            report = target.last_report
+            await send_ws_json(ws, {"type": "watch_artifact_start", "target": url, "query": report["query"], "reason": report["reason"]})
+            await send_result_image(ws, image=base64.b64decode(report["img_data"]))
+            if report["sources"]:
+                await send_ws_json(ws, {"type": "research_sources", "sources": report["sources"]})
+
+    def unsubscribe(self, ws: WebSocket, forget: bool = False) -> bool:
+        url = self.subscriptions.pop(ws, None)
+        target = self.targets.get(url) if url else None
+        if target is None:
+            return url is not None
+        target.subscribers.discard(ws)
+        if not target.subscribers:
+            self.targets.pop(url, None)
+            if target.research_task and not target.research_task.done():
+                target.research_task.cancel()
+            if forget:
+                watch_store.forget(url)
+        return True
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "targets": len(self.targets),
+            "subscribers": len(self.subscriptions),
+            "in_flight": len(self._polls),
+            "mean_interval_seconds": round(sum(t.interval for t in self.targets.values()) / len(self.targets), 1) if self.targets else None,
+        }
+
+    def _schedule(self, target: WatchTarget, delay: float):
+        target.due_at = time.monotonic() + max(0.0, delay)
+        heapq.heappush(self._heap, (target.due_at, next(self._sequence), target.url))
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            due_at, _, url = self._heap[0]
+            delay = due_at - time.monotonic()
+            if delay > 0:
+                self._wakeup.clear()
                 try:
-                    session_id = f"watch-{uuid.uuid4().hex[:8]}"
-                    api_result = await web_search_screenshot(workflow_query, session_id, False)
-                    if api_result:
-                        img_data, _ = api_result
-                        if not await send_ws_json(ws, {"type": "browser_screenshot", "data": img_data}):
-                            return
-                        session_data = perplexity_sessions.get(session_id, {})
-                        sources = session_data.get("search_results") or []
-                        if sources:
-                            if not await send_ws_json(ws, {"type": "research_sources", "sources": sources[:8]}):
-                                return
-                except Exception as research_error:
-                    print(f"⚠️ [WatchWorkflow] Auto research failed: {research_error}")
-                    await send_ws_json(ws, {
-                        "type": "status_update",
-                        "message": f"WARN: WATCH_WORKFLOW_RESEARCH_FAILED {str(research_error)[:80]}",
-                    })
-            previous = current
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._heap)
+            target = self.targets.get(url)
+            if target is None or target.due_at != due_at:
+                continue
+            await self._slots.acquire()
+            self.stats["late_ms_max"] = max(self.stats["late_ms_max"], int((time.monotonic() - due_at) * 1000))
+            task = asyncio.create_task(self._poll(target))
+            self._polls.add(task)
+            task.add_done_callback(self._polls.discard)
+
+    async def _broadcast(self, target: WatchTarget, payload: dict):
+        for ws in list(target.subscribers):
+            if not await send_ws_json(ws, payload):
+                self.unsubscribe(ws)
+
+    async def _poll(self, target: WatchTarget):
+        try:
+            self.stats["polls"] += 1
+            await self._check(target)
         except asyncio.CancelledError:
             raise
         except Exception as e:
+            self.stats["errors"] += 1
             message = str(e)
             if "Name or service not known" in message or "nodename nor servname" in message:
                 message = "Could not resolve that host. WATCH TARGET needs a public URL, not a search term."
-            if not await send_ws_json(ws, {
+            await self._broadcast(target, {
                 "type": "watch_update",
                 "status": "error",
-                "target": target,
+                "target": target.url,
                 "message": message[:180],
                 "checked_at": int(time.time()),
-            }):
-                return
-        await asyncio.sleep(WATCH_INTERVAL_SECONDS)
-
-async def stop_watch(ws: WebSocket, reason: str = "STOPPED"):
-    task = watch_tasks.pop(ws, None)
-    if task:
-        task.cancel()
+            })
+        finally:
+            self._slots.release()
+            if self.targets.get(target.url) is target:
+                spread = min(WATCH_JITTER_SECONDS, target.interval / 4)
+                self._schedule(target, target.interval + random.uniform(-spread, spread))
+
+    async def _check(self, target: WatchTarget):
+        previous = target.previous
+        current = await fetch_watch_snapshot(target.url, previous)
+        max_age = current.pop("max_age", None)
+        retry_after = current.pop("retry_after", None)
+        fingerprint = current.pop("fingerprint", None)
+        if previous and fingerprint is not None and current.get("content_hash") != target.fingerprint_hash:
+            current.update(diff_fingerprints(target.fingerprint, fingerprint) or {})
+        summary = summarize_change(previous, current)
+        current["change"] = summary
+        current["target"] = target.url
+        current["status"] = "changed" if previous and summary != "NO_CHANGE" else "ok"
+        # A change held back by the research cooldown stays pending until it is reported.
+        pending = current.get("similarity") is not None and current.get("content_hash") != target.fingerprint_hash
+        significant = bool(previous) and (summary != "NO_CHANGE" or pending) and is_significant_change(previous, current)
+        moved = bool(previous) and summary != "NO_CHANGE" and is_significant_change(
+            previous, {**current, **(diff_fingerprints(target.last_fingerprint, fingerprint) or {})}
+        )
+        if fingerprint is not None:
+            target.last_fingerprint = fingerprint
+        target.interval = next_watch_interval(target.interval, previous, current, moved, max_age, retry_after)
+        current["next_check_seconds"] = int(target.interval)
+        target.previous = current
+        watch_store.save(target.url, target.to_state())
+        await self._broadcast(target, {"type": "watch_update", **current})
+
+        reason = ""
+        if not target.baseline_reported:
+            reason = "baseline"
+            target.baseline_reported = True
+        elif significant:
+            reason = "change"
+        elif not current.get("ok"):
+            reason = "availability"
+        if not reason or (target.research_task and not target.research_task.done()):
+            return
+
+        signature = f"{reason}:{current.get('status_code')}:{current.get('content_hash')}:{current.get('title')}"
+        if signature == target.last_researched_signature:
+            return
+        now = time.time()
+        if reason != "baseline" and now - target.last_research_at < WATCH_RESEARCH_COOLDOWN_SECONDS:
+            if signature != target.cooldown_signature:
+                target.cooldown_signature = signature
+                await self._broadcast(target, {
+                    "type": "status_update",
+                    "message": f"WORKFLOW: CHANGE_DETECTED_REPORT_COOLDOWN {WATCH_RESEARCH_COOLDOWN_SECONDS}s",
+                })
+            return
+        target.last_researched_signature = signature
+        target.last_research_at = now
+        if fingerprint is not None:
+            target.fingerprint = fingerprint
+            target.fingerprint_hash = current.get("content_hash")
+        watch_store.save(target.url, target.to_state())
+        target.research_task = asyncio.create_task(self._research(target, current, reason, summary))
+
+    async def _research(self, target: WatchTarget, current: dict, reason: str, summary: str):
+        changed_sections = " | ".join(block["preview"] for block in (current.get("changed_blocks") or [])[:3])
+        workflow_query = (
+            f"URL monitor workflow report for {target.url}. "
+            f"Current status: HTTP {current.get('status_code')} in {current.get('elapsed_ms')}ms. "
+            f"Title: {current.get('title') or 'unknown'}. "
+            f"Detected reason: {reason}; change summary: {summary}. "
+            + (f"Changed sections: {changed_sections}. " if changed_sections else "")
+            + "Research this URL and produce a practical monitoring report: what changed or matters, "
+            "why a user should care, and recommended next actions. Include sources."
+        )
+        await self._broadcast(target, {
+            "type": "watch_artifact_start",
+            "target": target.url,
+            "query": workflow_query,
+            "reason": reason,
+        })
+        await self._broadcast(target, {"type": "status_update", "message": f"WORKFLOW: AUTO_RESEARCH_{reason.upper()}"})
         try:
-            await task
+            session_id = f"watch-{uuid.uuid4().hex[:8]}"
+            api_result = await research_queue.submit(
+                ("web", workflow_query, session_id, False),
+                lambda: web_search_screenshot(workflow_query, session_id, False, "watch"),
+                RESEARCH_PRIORITY_WATCH,
+                owner="watch",
+            )
+            session_data = perplexity_sessions.get(session_id, {})
+            perplexity_sessions.discard(session_id)
+            if not api_result:
+                return
+            img_bytes, _ = api_result
+            sources = (session_data.get("search_results") or [])[:8]
+            target.last_report = {"query": workflow_query, "reason": reason, "img_data": base64.b64encode(img_bytes).decode("utf-8"), "sources": sources}
+            watch_store.save_report(target.url, target.last_report)
+            for ws in list(target.subscribers):
+                if not await send_result_image(ws, image=img_bytes):
+                    self.unsubscribe(ws)
+            if sources:
+                await self._broadcast(target, {"type": "research_sources", "sources": sources})
         except asyncio.CancelledError:
-            pass
+            raise
+        except Exception as research_error:
+            print(f"⚠️ [WatchWorkflow] Auto research failed: {research_error}")
+            await self._broadcast(target, {
+                "type": "status_update",
+                "message": f"WARN: WATCH_WORKFLOW_RESEARCH_FAILED {str(research_error)[:80]}",
+            })
+
+watch_scheduler = WatchScheduler()
+
+async def stop_watch(ws: WebSocket, reason: str = "STOPPED", forget: bool = False):
+    if watch_scheduler.unsubscribe(ws, forget):
         await send_ws_json(ws, {"type": "watch_update", "status": "stopped", "message": reason})
 
 def load_proxy_config():
@@ -279,65 +1145,233 @@ def load_proxy_config():
         "password": password,
     }
 
-def render_search_results(query: str, provider: str, items: list[dict]) -> str:
-    width, height = 1280, 900
+FONT_PATHS = [
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/truetype/liberation2/LiberationSans-Regular.ttf",
+]
+BOLD_FONT_PATHS = [
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    "/usr/share/fonts/truetype/liberation2/LiberationSans-Bold.ttf",
+]
+SEARCH_CARD_SIZE = (1280, 900)
+PERPLEXITY_CARD_WIDTH = 1280
+PERPLEXITY_HEADER_HEIGHT = 250
+PERPLEXITY_FOOTER_HEIGHT = 40
+
+# Fonts and the static chrome of both result cards are built once per process and reused; renderers only
+# copy/paste the cached layers and draw the per-result text on top.
+@functools.lru_cache(maxsize=None)
+def resolve_font_path(bold: bool = False) -> str | None:
+    return next((path for path in (BOLD_FONT_PATHS if bold else FONT_PATHS) if os.path.exists(path)), None)
+
+@functools.lru_cache(maxsize=64)
+def load_truetype(path: str, size: int) -> ImageFont.FreeTypeFont:
+    return ImageFont.truetype(path, size=size)
+
+@functools.lru_cache(maxsize=1)
+def default_font():
+    return ImageFont.load_default()
+
+def load_font(size: int, bold: bool = False):
+    path = resolve_font_path(bold)
+    return load_truetype(path, size) if path else default_font()
+
+@functools.lru_cache(maxsize=4096)
+def word_mask(font, word: str):
+    left, top, right, bottom = font.getbbox(word)
+    mask = None
+    if right > left and bottom > top:
+        mask = Image.new("L", (right - left, bottom - top), 0)
+        ImageDraw.Draw(mask).text((-left, -top), word, fill=255, font=font)
+    return mask, left, top, font.getlength(word)
+
+def draw_text(image: Image.Image, xy: tuple[int, int], text: str, font, fill: str):
+    """Like ImageDraw.text, but glyph rasterization is cached per (font, word) since answers reuse most words."""
+    x, y = xy
+    space = word_mask(font, " ")[3]
+    for idx, word in enumerate(text.split(" ")):
+        if idx:
+            x += space
+        if not word:
+            continue
+        mask, left, top, advance = word_mask(font, word)
+        if mask is not None:
+            image.paste(fill, (round(x + left), y + top), mask)
+        x += advance
+
+@functools.lru_cache(maxsize=1)
+def search_results_template() -> Image.Image:
+    width, height = SEARCH_CARD_SIZE
     image = Image.new("RGB", (width, height), "#051014")
     draw = ImageDraw.Draw(image)
-    font = ImageFont.load_default()
+    font = default_font()
     accent = "#00f2ff"
-    green = "#00ffaa"
-    muted = "#8fb6bd"
-
-    draw.rectangle((0, 0, width, height), fill="#051014")
     for y in range(0, height, 48):
         draw.line((0, y, width, y), fill="#08262c")
     draw.rectangle((50, 45, width - 50, 130), outline=accent, width=2)
     draw.text((75, 68), "OMNILAB WEB SEARCH", fill="#ffffff", font=font)
-    draw.text((75, 95), f"PROVIDER: {provider.upper()} // QUERY: {query}", fill=green, font=font)
+    draw.rectangle((50, height - 70, width - 50, height - 35), outline="#13444d", width=1)
+    draw.text((75, height - 58), "DATA SOURCE: REAL SEARCH PROVIDER // NO PLACEHOLDER CONTENT", fill=accent, font=font)
+    return image
+
+@functools.lru_cache(maxsize=1)
+def perplexity_header_layer() -> Image.Image:
+    width = PERPLEXITY_CARD_WIDTH
+    image = Image.new("RGB", (width, PERPLEXITY_HEADER_HEIGHT), "#f6f8fb")
+    draw = ImageDraw.Draw(image)
+    draw.rounded_rectangle((44, 36, width - 44, 150), radius=18, fill="#ffffff", outline="#e6ebef", width=2)
+    draw.rounded_rectangle((70, 60, 210, 92), radius=16, fill="#e5f7f8")
+    draw.text((90, 67), "SOURCED ANSWER", fill="#127c87", font=load_font(14))
+    draw.text((70, 103), "Web Research", fill="#172026", font=load_font(30, True))
+    draw.rounded_rectangle((44, 170, width - 44, 238), radius=14, fill="#eef5ff", outline="#d7e4f5", width=1)
+    draw.text((70, 190), "Query", fill="#2557a7", font=load_font(14))
+    return image
+
+@functools.lru_cache(maxsize=1)
+def perplexity_footer_layer() -> Image.Image:
+    image = Image.new("RGB", (PERPLEXITY_CARD_WIDTH, PERPLEXITY_FOOTER_HEIGHT), "#f6f8fb")
+    draw = ImageDraw.Draw(image)
+    footer = "real web answer · source-backed · no placeholder content"
+    draw.text((70, PERPLEXITY_FOOTER_HEIGHT - 34), footer, fill="#63707a", font=load_font(14))
+    return image
+
+def jpeg_bytes(image: Image.Image, quality: int) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+def render_search_results(query: str, provider: str, items: list[dict]) -> bytes:
+    return jpeg_bytes(draw_search_results(query, provider, items), 88)
+
+def draw_search_results(query: str, provider: str, items: list[dict]) -> Image.Image:
+    width, height = SEARCH_CARD_SIZE
+    image = search_results_template().copy()
+    font = default_font()
+    green = "#00ffaa"
+    muted = "#8fb6bd"
+
+    draw_text(image, (75, 95), f"PROVIDER: {provider.upper()} // QUERY: {query}", fill=green, font=font)
 
     y = 165
     if not items:
-        draw.text((75, y), "NO RESULTS RETURNED BY SEARCH PROVIDER.", fill="#ff5577", font=font)
+        draw_text(image, (75, y), "NO RESULTS RETURNED BY SEARCH PROVIDER.", fill="#ff5577", font=font)
     for idx, item in enumerate(items[:8], start=1):
         title = item.get("title") or "Untitled result"
         link = item.get("link") or item.get("formattedUrl") or ""
         snippet = item.get("snippet") or ""
-        draw.text((75, y), f"{idx}. {title[:145]}", fill="#ffffff", font=font)
+        draw_text(image, (75, y), f"{idx}. {title[:145]}", fill="#ffffff", font=font)
         y += 24
         if link:
-            draw.text((95, y), link[:160], fill=green, font=font)
+            draw_text(image, (95, y), link[:160], fill=green, font=font)
             y += 22
         for line in textwrap.wrap(snippet, width=150)[:3]:
-            draw.text((95, y), line, fill=muted, font=font)
+            draw_text(image, (95, y), line, fill=muted, font=font)
             y += 20
         y += 18
         if y > height - 90:
             break
 
-    draw.rectangle((50, height - 70, width - 50, height - 35), outline="#13444d", width=1)
-    draw.text((75, height - 58), "DATA SOURCE: REAL SEARCH PROVIDER // NO PLACEHOLDER CONTENT", fill=accent, font=font)
-    buffer = io.BytesIO()
-    image.save(buffer, format="JPEG", quality=88)
-    return base64.b64encode(buffer.getvalue()).decode("utf-8")
-
-def render_perplexity_result(query: str, answer: str, citations: list[str], routing: dict, session_id: str, continued: bool) -> str:
-    width = 1280
-    font_paths = [
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-        "/usr/share/fonts/truetype/liberation2/LiberationSans-Regular.ttf",
-    ]
-    bold_paths = [
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
-        "/usr/share/fonts/truetype/liberation2/LiberationSans-Bold.ttf",
-    ]
+    return image
+
+def md_clean(text: str) -> str:
+    text = re.sub(r"!\[([^\]]*)\]\([^)]+\)", r"\1", text)
+    text = re.sub(r"\[([^\]]+)\]\(([^)]+)\)", r"\1", text)
+    text = re.sub(r"(\*\*|__|\*|`)", "", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+def line_kind(raw: str):
+    line = raw.strip()
+    if not line:
+        return "blank", "", ""
+    if line.startswith("#"):
+        return "heading", "", md_clean(line.lstrip("#").strip())
+    bullet = re.match(r"^[-*]\s+(.+)$", line)
+    if bullet:
+        return "bullet", "•", md_clean(bullet.group(1))
+    numbered = re.match(r"^(\d+)[.)]\s+(.+)$", line)
+    if numbered:
+        return "bullet", f"{numbered.group(1)}.", md_clean(numbered.group(2))
+    if line.startswith(">"):
+        return "quote", "", md_clean(line.lstrip(">").strip())
+    return "body", "", md_clean(line)
+
+def wrap_parts(text: str, max_chars: int):
+    return textwrap.wrap(text, width=max_chars) or [""]
+
+def build_answer_blocks(text: str):
+    blocks = []
+    clean = re.sub(r"\n{3,}", "\n\n", text or "").strip()
+    for raw in clean.splitlines():
+        kind, prefix, value = line_kind(raw)
+        if kind == "blank":
+            blocks.append({"kind": kind, "height": 12})
+        elif kind == "heading":
+            parts = wrap_parts(value, 76)
+            blocks.append({"kind": kind, "text": value, "height": 6 + len(parts) * 28 + 10})
+        elif kind == "bullet":
+            parts = wrap_parts(value, 102)
+            blocks.append({"kind": kind, "prefix": prefix, "text": value, "height": len(parts) * 25 + 5})
+        elif kind == "quote":
+            parts = wrap_parts(value, 96)
+            blocks.append({"kind": kind, "text": value, "height": len(parts) * 25 + 8})
+        else:
+            lead_match = re.match(r"^([^:]{3,48}):\s+(.+)$", value)
+            if lead_match:
+                label, rest = lead_match.groups()
+                parts = wrap_parts(rest, 104)
+                blocks.append({"kind": "lead", "label": label, "text": rest, "height": 26 + len(parts) * 25 + 10})
+            else:
+                parts = wrap_parts(value, 108)
+                blocks.append({"kind": kind, "text": value, "height": len(parts) * 25 + 10})
+    return blocks
 
-    def load_font(size: int, bold: bool = False):
-        for path in (bold_paths if bold else font_paths):
-            if os.path.exists(path):
-                return ImageFont.truetype(path, size=size)
-        return ImageFont.load_default()
+def perplexity_card(query: str, answer: str, citations: list[str], routing: dict, session_id: str, continued: bool) -> dict:
+    return {
+        "kind": "perplexity",
+        "query": query,
+        "answer": answer,
+        "blocks": build_answer_blocks(answer),
+        "citations": citations,
+        "routing": routing,
+        "session_id": session_id,
+        "continued": continued,
+    }
+
+def search_card(query: str, provider: str, items: list[dict]) -> dict:
+    return {
+        "kind": "search",
+        "query": query,
+        "provider": provider,
+        "items": [
+            {
+                "title": item.get("title") or "Untitled result",
+                "link": item.get("link") or item.get("formattedUrl") or "",
+                "snippet": item.get("snippet") or "",
+            }
+            for item in items[:8]
+        ],
+    }
+
+def render_card(card: dict) -> bytes:
+    """Server-side JPEG fallback for clients that did not negotiate structured results."""
+    if card["kind"] == "perplexity":
+        return render_perplexity_result(
+            card["query"], card["answer"], card["citations"], card["routing"], card["session_id"], card["continued"]
+        )
+    return render_search_results(card["query"], card["provider"], card["items"])
+
+def draw_card(card: dict) -> Image.Image:
+    if card["kind"] == "perplexity":
+        return draw_perplexity_result(
+            card["query"], card["answer"], card["citations"], card["routing"], card["session_id"], card["continued"]
+        )
+    return draw_search_results(card["query"], card["provider"], card["items"])
 
-    title_font = load_font(30, True)
+def render_perplexity_result(query: str, answer: str, citations: list[str], routing: dict, session_id: str, continued: bool) -> bytes:
+    return jpeg_bytes(draw_perplexity_result(query, answer, citations, routing, session_id, continued), 92)
+
+def draw_perplexity_result(query: str, answer: str, citations: list[str], routing: dict, session_id: str, continued: bool) -> Image.Image:
+    width = PERPLEXITY_CARD_WIDTH
     subtitle_font = load_font(17)
     section_font = load_font(20, True)
     body_font = load_font(18)
@@ -351,65 +1385,12 @@ def render_perplexity_result(query: str, answer: str, citations: list[str], rout
     card = "#ffffff"
     teal = "#127c87"
     teal_soft = "#e5f7f8"
-    blue = "#2557a7"
-
-    def md_clean(text: str) -> str:
-        text = re.sub(r"!\[([^\]]*)\]\([^)]+\)", r"\1", text)
-        text = re.sub(r"\[([^\]]+)\]\(([^)]+)\)", r"\1", text)
-        text = re.sub(r"(\*\*|__|\*|`)", "", text)
-        return re.sub(r"\s+", " ", text).strip()
-
-    def line_kind(raw: str):
-        line = raw.strip()
-        if not line:
-            return "blank", "", ""
-        if line.startswith("#"):
-            return "heading", "", md_clean(line.lstrip("#").strip())
-        bullet = re.match(r"^[-*]\s+(.+)$", line)
-        if bullet:
-            return "bullet", "•", md_clean(bullet.group(1))
-        numbered = re.match(r"^(\d+)[.)]\s+(.+)$", line)
-        if numbered:
-            return "bullet", f"{numbered.group(1)}.", md_clean(numbered.group(2))
-        if line.startswith(">"):
-            return "quote", "", md_clean(line.lstrip(">").strip())
-        return "body", "", md_clean(line)
-
-    def wrap_parts(text: str, max_chars: int):
-        return textwrap.wrap(text, width=max_chars) or [""]
-
-    def build_answer_blocks(text: str):
-        blocks = []
-        clean = re.sub(r"\n{3,}", "\n\n", text or "").strip()
-        for raw in clean.splitlines():
-            kind, prefix, value = line_kind(raw)
-            if kind == "blank":
-                blocks.append({"kind": kind, "height": 12})
-            elif kind == "heading":
-                parts = wrap_parts(value, 76)
-                blocks.append({"kind": kind, "text": value, "height": 6 + len(parts) * 28 + 10})
-            elif kind == "bullet":
-                parts = wrap_parts(value, 102)
-                blocks.append({"kind": kind, "prefix": prefix, "text": value, "height": len(parts) * 25 + 5})
-            elif kind == "quote":
-                parts = wrap_parts(value, 96)
-                blocks.append({"kind": kind, "text": value, "height": len(parts) * 25 + 8})
-            else:
-                lead_match = re.match(r"^([^:]{3,48}):\s+(.+)$", value)
-                if lead_match:
-                    label, rest = lead_match.groups()
-                    parts = wrap_parts(rest, 104)
-                    blocks.append({"kind": "lead", "label": label, "text": rest, "height": 26 + len(parts) * 25 + 10})
-                else:
-                    parts = wrap_parts(value, 108)
-                    blocks.append({"kind": kind, "text": value, "height": len(parts) * 25 + 10})
-        return blocks
 
     def draw_wrapped(text: str, x: int, y: int, max_chars: int, font, fill: str, line_height: int, prefix: str = ""):
         first_prefix = prefix
         next_prefix = " " * len(prefix)
         for idx, part in enumerate(wrap_parts(text, max_chars)):
-            draw.text((x, y), (first_prefix if idx == 0 else next_prefix) + part, fill=fill, font=font)
+            draw_text(image, (x, y), (first_prefix if idx == 0 else next_prefix) + part, fill=fill, font=font)
             y += line_height
         return y
 
@@ -422,27 +1403,23 @@ def render_perplexity_result(query: str, answer: str, citations: list[str], rout
     source_bottom = source_top + 92 + source_rows * 50
     height = source_bottom + 64
     image = Image.new("RGB", (width, height), "#f6f8fb")
+    image.paste(perplexity_header_layer(), (0, 0))
+    image.paste(perplexity_footer_layer(), (0, height - PERPLEXITY_FOOTER_HEIGHT))
     draw = ImageDraw.Draw(image)
 
-    draw.rounded_rectangle((44, 36, width - 44, 150), radius=18, fill=card, outline=faint, width=2)
-    draw.rounded_rectangle((70, 60, 210, 92), radius=16, fill=teal_soft)
-    draw.text((90, 67), "SOURCED ANSWER", fill=teal, font=small_font)
-    draw.text((70, 103), "Web Research", fill=ink, font=title_font)
     session_text = "continued session" if continued else "new session"
-    draw.text((width - 240, 72), session_text, fill=muted, font=small_font)
+    draw_text(image, (width - 240, 72), session_text, fill=muted, font=small_font)
 
     query_text = md_clean(query)
-    draw.rounded_rectangle((44, 170, width - 44, 238), radius=14, fill="#eef5ff", outline="#d7e4f5", width=1)
-    draw.text((70, 190), "Query", fill=blue, font=small_font)
     draw_wrapped(query_text, 132, 188, 120, subtitle_font, ink, 24)
 
     draw.rounded_rectangle((44, answer_top, width - 44, answer_bottom), radius=18, fill=card, outline=faint, width=2)
-    draw.text((70, answer_top + 26), "Answer", fill=teal, font=section_font)
+    draw_text(image, (70, answer_top + 26), "Answer", fill=teal, font=section_font)
 
     y = answer_top + 66
     for block in answer_blocks:
         if y + block["height"] > answer_bottom - 30:
-            draw.text((70, y), "Response continues in the Perplexity session; ask a follow-up or narrow the query.", fill=muted, font=body_font)
+            draw_text(image, (70, y), "Response continues in the Perplexity session; ask a follow-up or narrow the query.", fill=muted, font=body_font)
             break
         kind = block["kind"]
         if kind == "blank":
@@ -460,7 +1437,7 @@ def render_perplexity_result(query: str, answer: str, citations: list[str], rout
             y = draw_wrapped(block["text"], 92, y, 96, body_font, muted, 25)
             y += 8
         elif kind == "lead":
-            draw.text((70, y), f"{block['label']}:", fill=ink, font=body_bold)
+            draw_text(image, (70, y), f"{block['label']}:", fill=ink, font=body_bold)
             y = draw_wrapped(block["text"], 70, y + 26, 104, body_font, ink, 25)
             y += 10
         else:
@@ -468,27 +1445,330 @@ def render_perplexity_result(query: str, answer: str, citations: list[str], rout
             y += 10
 
     draw.rounded_rectangle((44, source_top, width - 44, source_bottom), radius=18, fill=card, outline=faint, width=2)
-    draw.text((70, source_top + 24), "Sources", fill=teal, font=section_font)
+    draw_text(image, (70, source_top + 24), "Sources", fill=teal, font=section_font)
     y = source_top + 62
     if citations:
         for idx, url in enumerate(citations[:6], start=1):
             parsed = urlparse(url)
             domain = parsed.netloc.replace("www.", "") or url
             draw.rounded_rectangle((70, y - 3, 118, y + 21), radius=10, fill=teal_soft)
-            draw.text((88, y), str(idx), fill=teal, font=source_font)
-            draw.text((132, y - 2), domain[:48], fill=ink, font=source_font)
-            draw.text((132, y + 18), url[:135], fill=muted, font=small_font)
+            draw_text(image, (88, y), str(idx), fill=teal, font=source_font)
+            draw_text(image, (132, y - 2), domain[:48], fill=ink, font=source_font)
+            draw_text(image, (132, y + 18), url[:135], fill=muted, font=small_font)
             y += 50
             if y > source_bottom - 38:
                 break
     else:
-        draw.text((70, y), "No sources returned by provider.", fill=muted, font=source_font)
+        draw_text(image, (70, y), "No sources returned by provider.", fill=muted, font=source_font)
 
-    footer = "real web answer · source-backed · no placeholder content"
-    draw.text((70, height - 34), footer, fill=muted, font=small_font)
+    return image
+
+IMAGE_ENCODERS = {
+    "jpeg": ("JPEG", "image/jpeg", {}),
+    "webp": ("WEBP", "image/webp", {"method": 4}),
+    "avif": ("AVIF", "image/avif", {"speed": 8}),
+}
+
+def supported_image_formats() -> set[str]:
+    return {"jpeg"} | {fmt for fmt in ("webp", "avif") if features.check(fmt)}
+
+def image_profile(client_type: str, accepted: list[str]) -> dict:
+    """Encoding settings for one HUD client: the first IMAGE_FORMATS entry it accepts, plus its size limits."""
+    accepted = {str(fmt).lower() for fmt in accepted} | {"jpeg"}
+    available = supported_image_formats()
+    fmt = next((fmt for fmt in IMAGE_FORMATS if fmt in accepted and fmt in available), "jpeg")
+    client_type = client_type if client_type in IMAGE_PROFILES else "desktop"
+    return {"client_type": client_type, "format": fmt, **IMAGE_PROFILES[client_type]}
+
+def encode_image(image: Image.Image, fmt: str, quality: int) -> bytes:
+    pil_format, _, options = IMAGE_ENCODERS[fmt]
     buffer = io.BytesIO()
-    image.save(buffer, format="JPEG", quality=92)
-    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+    image.save(buffer, format=pil_format, quality=quality, **options)
+    return buffer.getvalue()
+
+def fit_image(image: Image.Image, profile: dict) -> Image.Image:
+    """Downscales to the profile's max width and crops anything below its max height."""
+    image = image.convert("RGB")
+    if image.width > profile["max_width"]:
+        height = max(1, round(image.height * profile["max_width"] / image.width))
+        image = image.resize((profile["max_width"], height), Image.Resampling.BILINEAR, reducing_gap=2.0)
+    if image.height > profile["max_height"]:
+        image = image.crop((0, 0, image.width, profile["max_height"]))
+    return image
+
+def encode_preview(image: Image.Image, fmt: str) -> bytes | None:
+    if image.width <= IMAGE_PREVIEW_WIDTH * 2:
+        return None
+    height = max(1, round(image.height * IMAGE_PREVIEW_WIDTH / image.width))
+    return encode_image(image.resize((IMAGE_PREVIEW_WIDTH, height), Image.Resampling.BILINEAR), fmt, IMAGE_PREVIEW_QUALITY)
+
+def encode_to_target(image: Image.Image, profile: dict) -> dict:
+    """Highest quality (searched in steps of 5 between IMAGE_MIN/MAX_QUALITY) whose output fits target_bytes."""
+    started = time.perf_counter()
+    fmt = profile["format"]
+    low, high = IMAGE_MIN_QUALITY, IMAGE_MAX_QUALITY
+    data, quality, attempts = encode_image(image, fmt, high), high, 1
+    if len(data) > profile["target_bytes"] and high > low:
+        data, quality = encode_image(image, fmt, low), low
+        attempts += 1
+        while high - low > 5:
+            mid = (low + high) // 2
+            candidate = encode_image(image, fmt, mid)
+            attempts += 1
+            if len(candidate) <= profile["target_bytes"]:
+                data, quality, low = candidate, mid, mid
+            else:
+                high = mid
+    return {
+        "data": data,
+        "mime": IMAGE_ENCODERS[fmt][1],
+        "format": fmt,
+        "quality": quality,
+        "attempts": attempts,
+        "width": image.width,
+        "height": image.height,
+        "encode_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+# First stage of progressive delivery: produce the fitted image and its preview so the preview can be sent
+# while encode_to_target searches for the full-size quality.
+def prepare_card_image(card: dict, profile: dict) -> tuple[Image.Image, bytes | None]:
+    image = fit_image(draw_card(card), profile)
+    return image, encode_preview(image, profile["format"])
+
+def prepare_capture_image(data: bytes, profile: dict) -> tuple[Image.Image, bytes | None]:
+    image = fit_image(Image.open(io.BytesIO(data)), profile)
+    return image, encode_preview(image, profile["format"])
+
+class RenderPool:
+    """Runs the Pillow renderers off the event loop.
+
+    RENDER_EXECUTOR picks a thread pool (Pillow releases the GIL while encoding) or a process pool. At most
+    RENDER_MAX_PENDING renders are submitted at once; further callers wait for a slot, and a slot is only
+    freed when the executor actually finishes, so timed-out renders still count against the limit.
+    """
+
+    def __init__(self, kind: str, workers: int, max_pending: int, timeout: float):
+        self._kind = "process" if kind == "process" else "thread"
+        self._workers = workers
+        self._max_pending = max_pending
+        self._timeout = timeout
+        self._executor = None
+        self._slots: asyncio.Semaphore | None = None
+        self._pending = 0
+        self.wait_ms = LatencyWindow()
+        self.render_ms: dict[str, LatencyWindow] = collections.defaultdict(LatencyWindow)
+        self.stats = {"rendered": 0, "failed": 0, "timeouts": 0}
+
+    def start(self):
+        if self._executor is None:
+            if self._kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self._workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="render")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._max_pending)
+
+    def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def render(self, fn, *args):
+        self.start()
+        loop = asyncio.get_running_loop()
+        queued = time.perf_counter()
+        await self._slots.acquire()
+        started = time.perf_counter()
+        self.wait_ms.add((started - queued) * 1000)
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        self._pending += 1
+        future.add_done_callback(lambda _: self._release(loop))
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout=self._timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise RuntimeError(f"{fn.__name__} timed out after {self._timeout:g}s")
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.stats["failed"] += 1
+            raise
+        self.stats["rendered"] += 1
+        self.render_ms[fn.__name__].add((time.perf_counter() - started) * 1000)
+        return result
+
+    def _release(self, loop: asyncio.AbstractEventLoop):
+        def release():
+            self._pending -= 1
+            self._slots.release()
+        try:
+            loop.call_soon_threadsafe(release)
+        except RuntimeError:
+            pass
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "executor": self._kind,
+            "workers": self._workers,
+            "pending": self._pending,
+            "max_pending": self._max_pending,
+            "wait_ms": self.wait_ms.snapshot(),
+            "render_ms": {name: window.snapshot() for name, window in self.render_ms.items()},
+        }
+
+render_pool = RenderPool(RENDER_EXECUTOR, RENDER_WORKERS, RENDER_MAX_PENDING, RENDER_TIMEOUT_SECONDS)
+
+image_encode_ms: dict[str, LatencyWindow] = collections.defaultdict(LatencyWindow)
+image_encode_stats: dict[str, dict] = collections.defaultdict(lambda: {"images": 0, "bytes": 0, "preview_bytes": 0, "source_bytes": 0})
+
+async def send_result_image(ws: WebSocket, card: dict | None = None, image: bytes | None = None, meta: dict | None = None, preview: bool = True) -> bool:
+    """Delivers a result card or a browser capture in the socket's negotiated image profile.
+
+    Clients with a profile get a low-res preview first and then the size-targeted image, with its encoding
+    details in the header; everyone else gets the legacy server JPEG. meta (e.g. the segment index of a tiled
+    capture) is added to every header; sockets that never sent a hello only get the first segment.
+    """
+    client = hud_clients.get(ws)
+    meta = meta or {}
+    if meta.get("segment", 0) > 0 and (client is None or not (client.binary_frames or client.artifact_urls)):
+        return True
+    profile = client.image_profile if client and (client.binary_frames or client.artifact_urls) else None
+    if profile is None:
+        if image is None:
+            image = await render_pool.render(render_card, card)
+        return await send_ws_image(ws, image, meta=meta)
+    started = time.perf_counter()
+    if card is not None:
+        fitted, thumbnail = await render_pool.render(prepare_card_image, card, profile)
+    else:
+        fitted, thumbnail = await render_pool.render(prepare_capture_image, image, profile)
+    prepare_ms = round((time.perf_counter() - started) * 1000, 1)
+    mime = IMAGE_ENCODERS[profile["format"]][1]
+    if preview and thumbnail and not await send_ws_image(ws, thumbnail, mime, {**meta, "preview": True}):
+        return False
+    encoded = await render_pool.render(encode_to_target, fitted, profile)
+    stats = image_encode_stats[f"{profile['client_type']}/{encoded['format']}"]
+    stats["images"] += 1
+    stats["bytes"] += len(encoded["data"])
+    stats["preview_bytes"] += len(thumbnail or b"") if preview else 0
+    stats["source_bytes"] += len(image or b"")
+    image_encode_ms[encoded["format"]].add(encoded["encode_ms"])
+    encoding = {key: encoded[key] for key in ("format", "quality", "attempts", "width", "height", "encode_ms")}
+    encoding["prepare_ms"] = prepare_ms
+    encoding["bytes"] = len(encoded["data"])
+    return await send_ws_image(ws, encoded["data"], encoded["mime"], {**meta, "encoding": encoding})
+
+class ArtifactStore:
+    """Content-addressed image store on disk, served by /artifacts/{id}.
+
+    Files are named by the SHA-256 of their bytes (two-level fan-out, extension from the MIME type), so an id
+    never changes meaning and can be cached as immutable. The total size is kept under max_bytes by evicting
+    the least recently used files; recency is rebuilt from file mtimes on startup.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self._max_bytes = max_bytes
+        self._entries: collections.OrderedDict[str, dict] = collections.OrderedDict()
+        self._bytes = 0
+        self.stats = {"stores": 0, "dedup_hits": 0, "hits": 0, "misses": 0, "evictions": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.root)
+
+    async def open(self):
+        if not self.enabled:
+            return
+        try:
+            found = await asyncio.to_thread(self._scan_sync)
+        except OSError as e:
+            print(f"⚠️ [Artifacts] Store disabled, could not open {self.root}: {e}")
+            self.root = ""
+            return
+        for artifact_id, entry in sorted(found.items(), key=lambda item: item[1]["mtime"]):
+            self._entries[artifact_id] = entry
+            self._bytes += entry["size"]
+        await self._evict()
+
+    def _scan_sync(self) -> dict[str, dict]:
+        os.makedirs(self.root, exist_ok=True)
+        found = {}
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                artifact_id, ext = os.path.splitext(name)
+                if ext not in ARTIFACT_MIME_TYPES or not re.fullmatch(r"[0-9a-f]{64}", artifact_id):
+                    continue
+                path = os.path.join(dirpath, name)
+                stat = os.stat(path)
+                found[artifact_id] = {"path": path, "size": stat.st_size, "mime": ARTIFACT_MIME_TYPES[ext], "mtime": stat.st_mtime}
+        return found
+
+    async def put(self, data: bytes, mime: str = "image/jpeg") -> str:
+        artifact_id = hashlib.sha256(data).hexdigest()
+        entry = self._entries.get(artifact_id)
+        if entry is not None:
+            self._entries.move_to_end(artifact_id)
+            self.stats["dedup_hits"] += 1
+            return artifact_id
+        ext = next((ext for ext, known in ARTIFACT_MIME_TYPES.items() if known == mime), ".bin")
+        path = os.path.join(self.root, artifact_id[:2], artifact_id + ext)
+        await asyncio.to_thread(self._write_sync, path, data)
+        self._entries[artifact_id] = {"path": path, "size": len(data), "mime": mime, "mtime": time.time()}
+        self._bytes += len(data)
+        self.stats["stores"] += 1
+        await self._evict()
+        return artifact_id
+
+    def _write_sync(self, path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get(self, artifact_id: str) -> dict | None:
+        entry = self._entries.get(artifact_id)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(artifact_id)
+        self.stats["hits"] += 1
+        return entry
+
+    async def _evict(self):
+        doomed = []
+        while self._bytes > self._max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry["size"]
+            doomed.append(entry["path"])
+        if doomed:
+            self.stats["evictions"] += len(doomed)
+            await asyncio.to_thread(self._unlink_sync, doomed)
+
+    def _unlink_sync(self, paths: list[str]):
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self._max_bytes,
+        }
+
+artifact_store = ArtifactStore(ARTIFACT_STORE_DIR, ARTIFACT_STORE_MAX_BYTES)
 
 def pwm_binary_available() -> bool:
     return os.path.exists(PWM_COMMAND) or shutil.which("pwm") is not None
@@ -505,14 +1785,584 @@ def wants_generated_image(query: str) -> bool:
     ]
     return any(term in text for term in image_terms)
 
-async def perplexity_web_screenshot(query: str, session_id: str, continue_session: bool):
+PERPLEXITY_WORKER_SCRIPT = r"""
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+protocol = sys.stdout
+sys.stdout = sys.stderr
+
+from perplexity_web_mcp.core import Perplexity, ConversationConfig
+from perplexity_web_mcp.enums import SourceFocus, SearchFocus, CitationMode
+from perplexity_web_mcp.models import Models
+
+state = {"client": None, "token_file": None, "token_mtime": None}
+
+def emit(message):
+    protocol.write(json.dumps(message, ensure_ascii=False) + "\n")
+    protocol.flush()
+
+def serialize_results(results):
+    return [
+        {"title": getattr(item, "title", None), "snippet": getattr(item, "snippet", None), "url": getattr(item, "url", None)}
+        for item in results or []
+    ]
+
+def ask_streaming(conv, query, request_id, **kwargs):
+    try:
+        stream = conv.ask(query, stream=True, **kwargs)
+    except TypeError:
+        conv.ask(query, **kwargs)
+        return
+    if not hasattr(stream, "__next__"):
+        return
+    sent = ""
+    sources_sent = 0
+    for _ in stream:
+        answer = conv.answer or ""
+        if answer != sent:
+            replace = not answer.startswith(sent)
+            emit({"id": request_id, "event": "partial", "text": answer if replace else answer[len(sent):], "replace": replace})
+            sent = answer
+        results = conv.search_results or []
+        if len(results) > sources_sent:
+            emit({"id": request_id, "event": "sources", "search_results": serialize_results(results)})
+            sources_sent = len(results)
+
+def get_client(token_file):
+    mtime = os.path.getmtime(token_file)
+    if state["client"] is None or state["token_file"] != token_file or state["token_mtime"] != mtime:
+        reset_client()
+        state["client"] = Perplexity(session_token=Path(token_file).read_text().strip())
+        state["token_file"] = token_file
+        state["token_mtime"] = mtime
+    return state["client"]
+
+def reset_client():
+    if state["client"] is not None:
+        try:
+            state["client"].close()
+        except Exception:
+            pass
+    state["client"] = None
+
+def ask(payload, request_id):
+    client = get_client(payload["token_file"])
+    conv = client.create_conversation(ConversationConfig(
+        source_focus=SourceFocus.WEB,
+        search_focus=SearchFocus.WEB,
+        citation_mode=CitationMode.CLEAN,
+        save_to_library=False,
+        language="pt-BR",
+        timezone="America/Sao_Paulo",
+    ))
+    if payload.get("backend_uuid") and payload.get("read_write_token"):
+        conv._backend_uuid = payload["backend_uuid"]
+        conv._read_write_token = payload["read_write_token"]
+
+    image_intent = bool(payload.get("image_intent"))
+    kwargs = {"model": Models.CREATE_FILES_AND_APPS} if image_intent else {}
+    if payload.get("stream"):
+        ask_streaming(conv, payload["query"], request_id, **kwargs)
+    else:
+        conv.ask(payload["query"], **kwargs)
+    primary_answer = conv.answer or ""
+    asset_urls = []
+    raw_data = getattr(conv, "_raw_data", None)
+    if raw_data:
+        raw_text = json.dumps(raw_data, ensure_ascii=False)
+        for url in re.findall(r"https?://user-gen-media-assets\.s3\.amazonaws\.com/[^\s\"'<>]+", raw_text):
+            asset_urls.append(url.rstrip(".,);]*_`"))
+
+    if image_intent or re.search(r"Media generated", primary_answer, re.I):
+        followup = (
+            "In this same conversation, what is the public URL, S3 URL, CDN URL, or downloadable link "
+            "for the image/media asset you just generated? Return only the direct image URL if available. "
+            "If not available, say NO_URL."
+        )
+        conv.ask(followup, model=Models.CREATE_FILES_AND_APPS)
+        for url in re.findall(r"https?://[^\s\"'<>]+", conv.answer or ""):
+            clean_url = url.rstrip(".,);]*_`")
+            if "user-gen-media-assets.s3.amazonaws.com" in clean_url or re.search(r"\.(png|jpg|jpeg|webp)(\?|$)", clean_url, re.I):
+                asset_urls.append(clean_url)
+
+    return {
+        "answer": primary_answer,
+        "search_results": serialize_results(conv.search_results),
+        "asset_urls": list(dict.fromkeys(asset_urls)),
+        "backend_uuid": conv._backend_uuid,
+        "read_write_token": conv._read_write_token,
+        "conversation_uuid": conv.uuid,
+    }
+
+for line in sys.stdin:
+    line = line.strip()
+    if not line:
+        continue
+    message = json.loads(line)
+    try:
+        if message.get("op") == "ping":
+            result = {"pong": True}
+        else:
+            result = ask(message["payload"], message.get("id"))
+        reply = {"id": message.get("id"), "ok": True, "result": result}
+    except Exception as e:
+        reset_client()
+        reply = {"id": message.get("id"), "ok": False, "error": f"{type(e).__name__}: {e}"}
+    emit(reply)
+reset_client()
+"""
+
+class PerplexityWorkerError(RuntimeError):
+    pass
+
+class PerplexityWorker:
+    """One resident PWM_PYTHON helper that keeps perplexity_web_mcp imported and its client open."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.proc: asyncio.subprocess.Process | None = None
+        self.requests = 0
+        self.restarts = 0
+        self.started = False
+        self._ids = itertools.count(1)
+        self._stderr_tail: collections.deque[str] = collections.deque(maxlen=20)
+        self._stderr_task: asyncio.Task | None = None
+
+    @property
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.returncode is None
+
+    async def ensure_started(self):
+        if self.alive and self.requests < PERPLEXITY_WORKER_MAX_REQUESTS:
+            return
+        if self.started:
+            self.restarts += 1
+        self.kill()
+        self.started = True
+        self.proc = await asyncio.create_subprocess_exec(
+            PWM_PYTHON, "-u", "-c", PERPLEXITY_WORKER_SCRIPT,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=os.path.expanduser("~"),
+            limit=16 * 1024 * 1024,
+        )
+        self.requests = 0
+        self._stderr_task = asyncio.create_task(self._drain_stderr(self.proc))
+        print(f"✅ [PerplexityWorker] Worker {self.index} started (pid {self.proc.pid})")
+
+    async def _drain_stderr(self, proc: asyncio.subprocess.Process):
+        while True:
+            line = await proc.stderr.readline()
+            if not line:
+                return
+            self._stderr_tail.append(line.decode("utf-8", errors="replace").rstrip())
+
+    async def request(self, op: str, payload: dict | None, timeout: float, on_event=None) -> dict:
+        request_id = self.send(op, payload)
+        await self.proc.stdin.drain()
+        return await self.reply(op, request_id, time.monotonic() + timeout, on_event)
+
+    def send(self, op: str, payload: dict | None) -> int:
+        request_id = next(self._ids)
+        self.proc.stdin.write((json.dumps({"id": request_id, "op": op, "payload": payload}, ensure_ascii=False) + "\n").encode("utf-8"))
+        return request_id
+
+    async def reply(self, op: str, request_id: int, deadline: float, on_event=None) -> dict:
+        """Reads the reply lines of request_id until its final one, forwarding streamed events to on_event."""
+        while True:
+            line = await asyncio.wait_for(self.proc.stdout.readline(), timeout=max(0.0, deadline - time.monotonic()))
+            if not line:
+                raise RuntimeError(f"perplexity worker exited: {self.stderr_tail()}")
+            reply = json.loads(line)
+            if reply.get("id") != request_id:
+                raise RuntimeError("perplexity worker protocol out of sync")
+            if "event" not in reply:
+                break
+            if on_event:
+                await on_event(reply)
+        if op != "ping":
+            self.requests += 1
+        if not reply.get("ok"):
+            raise PerplexityWorkerError(reply.get("error") or "unknown error")
+        return reply.get("result") or {}
+
+    def stderr_tail(self) -> str:
+        return " | ".join(self._stderr_tail)[-300:]
+
+    def kill(self):
+        if self.alive:
+            self.proc.kill()
+        self.proc = None
+        if self._stderr_task:
+            self._stderr_task.cancel()
+            self._stderr_task = None
+
+class PerplexityWorkerPool:
+    """Fixed set of resident Perplexity helpers with health checks, crash restarts and per-request timeouts.
+
+    A worker that times out or crashes is killed and respawned before it goes back to the idle queue, because
+    the blocking conversation inside it cannot be interrupted any other way. When only the caller is cancelled
+    (e.g. a hedged race was won by another provider) the worker stays out of the queue until its reply for
+    that request arrives and then rejoins warm; it is killed only if the original deadline passes first.
+    """
+
+    def __init__(self, size: int):
+        self.workers = [PerplexityWorker(index) for index in range(size)]
+        self._idle: asyncio.Queue = asyncio.Queue()
+        for worker in self.workers:
+            self._idle.put_nowait(worker)
+        self._health_task: asyncio.Task | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.latency_ms = LatencyWindow()
+        self.stats = {"requests": 0, "errors": 0, "timeouts": 0, "cancelled": 0, "recovered": 0, "health_failures": 0}
+
+    async def start(self):
+        if not perplexity_library_available():
+            return
+        for worker in self.workers:
+            try:
+                await worker.ensure_started()
+            except Exception as e:
+                print(f"⚠️ [PerplexityWorker] Could not start worker {worker.index}: {e}")
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def stop(self):
+        if self._health_task:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for worker in self.workers:
+            worker.kill()
+
+    async def ask(self, payload: dict, timeout: float = PERPLEXITY_WORKER_TIMEOUT_SECONDS, on_event=None) -> dict:
+        worker = await self._idle.get()
+        started = time.perf_counter()
+        deadline = time.monotonic() + timeout
+        self.stats["requests"] += 1
+        healthy = False
+        request_id = None
+        try:
+            await worker.ensure_started()
+            request_id = worker.send("ask", payload)
+            await worker.proc.stdin.drain()
+            result = await worker.reply("ask", request_id, deadline, on_event)
+            healthy = True
+            self.latency_ms.add((time.perf_counter() - started) * 1000)
+            return result
+        except PerplexityWorkerError as e:
+            healthy = True
+            self.stats["errors"] += 1
+            raise RuntimeError(f"perplexity library failed: {str(e)[:300]}")
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise RuntimeError(f"perplexity library timed out after {timeout:g}s")
+        except asyncio.CancelledError:
+            self.stats["cancelled"] += 1
+            if request_id is not None and worker.alive:
+                self._spawn(self._finish_abandoned(worker, request_id, deadline))
+                request_id = None
+                healthy = None
+            raise
+        except Exception as e:
+            self.stats["errors"] += 1
+            tail = worker.stderr_tail()
+            raise RuntimeError(f"perplexity library failed: {tail or e}")
+        finally:
+            if healthy:
+                self._idle.put_nowait(worker)
+            elif healthy is False:
+                worker.kill()
+                self._spawn(self._respawn(worker))
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _finish_abandoned(self, worker: PerplexityWorker, request_id: int, deadline: float):
+        try:
+            await worker.proc.stdin.drain()
+            await worker.reply("ask", request_id, deadline)
+        except PerplexityWorkerError:
+            pass
+        except asyncio.CancelledError:
+            worker.kill()
+            raise
+        except Exception as e:
+            print(f"⚠️ [PerplexityWorker] Worker {worker.index} did not finish an abandoned request: {e}")
+            worker.kill()
+            await self._respawn(worker)
+            return
+        self.stats["recovered"] += 1
+        self._idle.put_nowait(worker)
+
+    async def _respawn(self, worker: PerplexityWorker):
+        try:
+            await worker.ensure_started()
+        except Exception as e:
+            print(f"⚠️ [PerplexityWorker] Could not restart worker {worker.index}: {e}")
+        finally:
+            self._idle.put_nowait(worker)
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(PERPLEXITY_WORKER_HEALTH_SECONDS)
+            for _ in range(self._idle.qsize()):
+                worker = self._idle.get_nowait()
+                try:
+                    await worker.ensure_started()
+                    await worker.request("ping", None, timeout=10)
+                except Exception as e:
+                    self.stats["health_failures"] += 1
+                    print(f"⚠️ [PerplexityWorker] Worker {worker.index} failed health check: {e}")
+                    worker.kill()
+                finally:
+                    self._idle.put_nowait(worker)
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "workers": len(self.workers),
+            "alive": sum(1 for worker in self.workers if worker.alive),
+            "idle": self._idle.qsize(),
+            "restarts": sum(worker.restarts for worker in self.workers),
+            "latency_ms": self.latency_ms.snapshot(),
+        }
+
+perplexity_workers = PerplexityWorkerPool(PERPLEXITY_WORKERS)
+pwm_slots = asyncio.Semaphore(PWM_MAX_CONCURRENT)
+pwm_stats = {"running": 0, "waiting": 0, "timeouts": 0, "cancelled": 0}
+pwm_reapers: set[asyncio.Task] = set()
+
+def terminate_process_group(proc: asyncio.subprocess.Process):
+    if proc.returncode is not None:
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+    task = asyncio.create_task(_reap_process_group(proc))
+    pwm_reapers.add(task)
+    task.add_done_callback(pwm_reapers.discard)
+
+async def _reap_process_group(proc: asyncio.subprocess.Process):
+    try:
+        await asyncio.wait_for(proc.wait(), timeout=3)
+    except asyncio.TimeoutError:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        await proc.wait()
+
+async def drain_stream_tail(stream: asyncio.StreamReader, tail: bytearray, max_bytes: int):
+    """Reads a pipe to EOF so the child never blocks on it, keeping only the last max_bytes for error messages."""
+    while True:
+        chunk = await stream.read(65536)
+        if not chunk:
+            return
+        tail += chunk
+        del tail[:-max_bytes]
+
+async def read_json_stream(stream: asyncio.StreamReader, max_bytes: int) -> dict | None:
+    """Reads stdout as it arrives and returns as soon as it holds one complete JSON document."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buffer = ""
+    received = 0
+    while True:
+        chunk = await stream.read(65536)
+        received += len(chunk)
+        if received > max_bytes:
+            raise RuntimeError(f"pwm output exceeded {max_bytes} bytes")
+        buffer += decoder.decode(chunk, not chunk)
+        text = buffer.strip()
+        if text.startswith("{") and text.endswith("}"):
+            try:
+                return json.loads(text)
+            except ValueError:
+                pass
+        if not chunk:
+            return json.loads(text) if text else None
+
+async def run_pwm_ask(command: list[str], env: dict, cwd: str) -> dict:
+    pwm_stats["waiting"] += 1
+    async with pwm_slots:
+        pwm_stats["waiting"] -= 1
+        pwm_stats["running"] += 1
+        proc = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=env,
+            cwd=cwd,
+            start_new_session=True,
+        )
+        stderr_tail = bytearray()
+        stderr_task = asyncio.create_task(drain_stream_tail(proc.stderr, stderr_tail, PWM_STDERR_TAIL_BYTES))
+        try:
+            data = await asyncio.wait_for(read_json_stream(proc.stdout, PWM_MAX_OUTPUT_BYTES), timeout=PWM_TIMEOUT_SECONDS)
+            try:
+                await asyncio.wait_for(proc.wait(), timeout=1)
+            except asyncio.TimeoutError:
+                terminate_process_group(proc)
+            if proc.returncode not in (None, 0) or data is None:
+                await asyncio.wait([stderr_task], timeout=2)
+                stderr = bytes(stderr_tail).decode("utf-8", errors="replace").strip()
+                raise RuntimeError(f"pwm failed: {stderr[-300:]}")
+            return data
+        except asyncio.TimeoutError:
+            pwm_stats["timeouts"] += 1
+            terminate_process_group(proc)
+            raise RuntimeError(f"pwm timed out after {PWM_TIMEOUT_SECONDS:g}s")
+        except asyncio.CancelledError:
+            pwm_stats["cancelled"] += 1
+            terminate_process_group(proc)
+            raise
+        except BaseException:
+            terminate_process_group(proc)
+            raise
+        finally:
+            pwm_stats["running"] -= 1
+            if not stderr_task.done():
+                stderr_task.cancel()
+
+class ResearchProgress:
+    """Routes incremental research events for a session to the HUD sockets waiting on it."""
+
+    def __init__(self):
+        self._listeners: dict[str, set[WebSocket]] = collections.defaultdict(set)
+        self.stats = {"events": 0}
+
+    def subscribe(self, session_id: str, ws: WebSocket):
+        self._listeners[session_id].add(ws)
+
+    def unsubscribe(self, session_id: str, ws: WebSocket):
+        listeners = self._listeners.get(session_id)
+        if listeners is not None:
+            listeners.discard(ws)
+            if not listeners:
+                self._listeners.pop(session_id, None)
+
+    def has_listeners(self, session_id: str) -> bool:
+        return bool(self._listeners.get(session_id))
+
+    async def publish(self, session_id: str, payload: dict):
+        for ws in list(self._listeners.get(session_id, ())):
+            self.stats["events"] += 1
+            if not await send_ws_json(ws, payload):
+                self.unsubscribe(session_id, ws)
+
+research_progress = ResearchProgress()
+
+class SessionStore:
+    """Research sessions (Perplexity conversation handles or pwm turn history) keyed by session_id.
+
+    Entries expire after an idle TTL and are evicted least-recently-used once a client holds too many
+    sessions or the store exceeds its entry or byte budget. Each entry records the client that created it
+    so a purge only drops that client's sessions.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float, per_client: int):
+        self._entries: collections.OrderedDict[str, dict] = collections.OrderedDict()
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl = ttl_seconds
+        self._per_client = per_client
+        self._bytes = 0
+        self.stats = {"stores": 0, "evictions": 0, "expired": 0, "purged": 0}
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def get(self, session_id: str, default=None):
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return default
+        now = time.monotonic()
+        if entry["expires_at"] <= now:
+            self._drop(session_id)
+            self.stats["expired"] += 1
+            return default
+        entry["expires_at"] = now + self._ttl
+        self._entries.move_to_end(session_id)
+        return entry["value"]
+
+    def put(self, session_id: str, value, owner: str = ""):
+        self._expire()
+        previous = self._entries.get(session_id)
+        if previous is not None and not owner:
+            owner = previous["owner"]
+        self._drop(session_id)
+        size = len(session_id) + len(json.dumps(value, ensure_ascii=False, default=str))
+        self._entries[session_id] = {"value": value, "owner": owner, "size": size, "expires_at": time.monotonic() + self._ttl}
+        self._bytes += size
+        self.stats["stores"] += 1
+        owned = [key for key, entry in self._entries.items() if entry["owner"] == owner]
+        for key in owned[:max(0, len(owned) - self._per_client)]:
+            self._drop(key)
+            self.stats["evictions"] += 1
+        while len(self._entries) > 1 and (len(self._entries) > self._max_entries or self._bytes > self._max_bytes):
+            self._drop(next(iter(self._entries)))
+            self.stats["evictions"] += 1
+
+    def discard(self, session_id: str):
+        self._drop(session_id)
+
+    def clear(self, owner: str | None = None):
+        doomed = [key for key, entry in self._entries.items() if owner is None or entry["owner"] == owner]
+        for key in doomed:
+            self._drop(key)
+        self.stats["purged"] += len(doomed)
+
+    def _expire(self):
+        now = time.monotonic()
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry["expires_at"] > now:
+                break
+            self._drop(key)
+            self.stats["expired"] += 1
+
+    def _drop(self, session_id: str):
+        entry = self._entries.pop(session_id, None)
+        if entry:
+            self._bytes -= entry["size"]
+
+    def snapshot(self) -> dict:
+        self._expire()
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "clients": len({entry["owner"] for entry in self._entries.values()}),
+            "bytes": self._bytes,
+            "max_entries": self._max_entries,
+            "max_bytes": self._max_bytes,
+        }
+
+perplexity_sessions = SessionStore(
+    PERPLEXITY_SESSION_MAX_ENTRIES,
+    PERPLEXITY_SESSION_MAX_BYTES,
+    PERPLEXITY_SESSION_TTL_SECONDS,
+    PERPLEXITY_SESSIONS_PER_CLIENT,
+)
+
+async def perplexity_web_search(query: str, session_id: str, continue_session: bool, owner: str = ""):
     if perplexity_library_available():
-        return await perplexity_library_screenshot(query, session_id, continue_session)
+        return await perplexity_library_search(query, session_id, continue_session, owner)
 
     if not pwm_binary_available():
         return None
 
-    history = perplexity_sessions.get(session_id, [])
+    history = list(perplexity_sessions.get(session_id, []))
     effective_query = query
     if continue_session and history:
         context_lines = []
@@ -532,20 +2382,7 @@ async def perplexity_web_screenshot(query: str, session_id: str, continue_sessio
     env["PATH"] = f"{home}/.local/bin:" + env.get("PATH", "")
 
     print(f"🚀 [Perplexity] Querying session={session_id} continue={continue_session}: {query}")
-    proc = await asyncio.to_thread(
-        subprocess.run,
-        command,
-        capture_output=True,
-        text=True,
-        timeout=90,
-        env=env,
-        cwd=home,
-    )
-    if proc.returncode != 0:
-        stderr = (proc.stderr or proc.stdout or "").strip()
-        raise RuntimeError(f"pwm failed: {stderr[:300]}")
-
-    data = json.loads(proc.stdout)
+    data = await run_pwm_ask(command, env, home)
     answer = data.get("answer") or ""
     citations = data.get("citations") or []
     routing = data.get("routing") or {}
@@ -553,10 +2390,10 @@ async def perplexity_web_screenshot(query: str, session_id: str, continue_sessio
         return None
 
     history.append({"query": query, "answer": answer, "citations": citations})
-    perplexity_sessions[session_id] = history[-PERPLEXITY_SESSION_TURNS:]
-    return render_perplexity_result(query, answer, citations, routing, session_id, continue_session), False
+    perplexity_sessions.put(session_id, history[-PERPLEXITY_SESSION_TURNS:], owner)
+    return perplexity_card(query, answer, citations, routing, session_id, continue_session), False
 
-async def perplexity_library_screenshot(query: str, session_id: str, continue_session: bool):
+async def perplexity_library_search(query: str, session_id: str, continue_session: bool, owner: str = ""):
     session = perplexity_sessions.get(session_id) if continue_session else None
     payload = {
         "query": query,
@@ -565,89 +2402,26 @@ async def perplexity_library_screenshot(query: str, session_id: str, continue_se
         "backend_uuid": session.get("backend_uuid") if session else None,
         "read_write_token": session.get("read_write_token") if session else None,
         "token_file": PERPLEXITY_TOKEN_FILE,
+        "stream": research_progress.has_listeners(session_id),
     }
-    script = r"""
-import json
-import re
-import sys
-from pathlib import Path
-from perplexity_web_mcp.core import Perplexity, ConversationConfig
-from perplexity_web_mcp.enums import SourceFocus, SearchFocus, CitationMode
-from perplexity_web_mcp.models import Models
 
-payload = json.loads(sys.stdin.read())
-session_token = Path(payload["token_file"]).read_text().strip()
-client = Perplexity(session_token=session_token)
-conv = client.create_conversation(ConversationConfig(
-    source_focus=SourceFocus.WEB,
-    search_focus=SearchFocus.WEB,
-    citation_mode=CitationMode.CLEAN,
-    save_to_library=False,
-    language="pt-BR",
-    timezone="America/Sao_Paulo",
-))
-if payload.get("backend_uuid") and payload.get("read_write_token"):
-    conv._backend_uuid = payload["backend_uuid"]
-    conv._read_write_token = payload["read_write_token"]
-
-image_intent = bool(payload.get("image_intent"))
-if image_intent:
-    conv.ask(payload["query"], model=Models.CREATE_FILES_AND_APPS)
-else:
-    conv.ask(payload["query"])
-primary_answer = conv.answer or ""
-asset_urls = []
-raw_data = getattr(conv, "_raw_data", None)
-if raw_data:
-    raw_text = json.dumps(raw_data, ensure_ascii=False)
-    for url in re.findall(r"https?://user-gen-media-assets\.s3\.amazonaws\.com/[^\s\"'<>]+", raw_text):
-        asset_urls.append(url.rstrip(".,);]*_`"))
-
-if image_intent or re.search(r"Media generated", primary_answer, re.I):
-    followup = (
-        "In this same conversation, what is the public URL, S3 URL, CDN URL, or downloadable link "
-        "for the image/media asset you just generated? Return only the direct image URL if available. "
-        "If not available, say NO_URL."
-    )
-    conv.ask(followup, model=Models.CREATE_FILES_AND_APPS)
-    for url in re.findall(r"https?://[^\s\"'<>]+", conv.answer or ""):
-        clean_url = url.rstrip(".,);]*_`")
-        if "user-gen-media-assets.s3.amazonaws.com" in clean_url or re.search(r"\.(png|jpg|jpeg|webp)(\?|$)", clean_url, re.I):
-            asset_urls.append(clean_url)
-
-search_results = []
-for item in conv.search_results:
-    search_results.append({
-        "title": getattr(item, "title", None),
-        "snippet": getattr(item, "snippet", None),
-        "url": getattr(item, "url", None),
-    })
-
-print(json.dumps({
-    "answer": primary_answer,
-    "search_results": search_results,
-    "asset_urls": list(dict.fromkeys(asset_urls)),
-    "backend_uuid": conv._backend_uuid,
-    "read_write_token": conv._read_write_token,
-    "conversation_uuid": conv.uuid,
-}, ensure_ascii=False))
-client.close()
-"""
-    print(f"🚀 [PerplexityLib] Querying session={session_id} continue={continue_session}: {query}")
-    proc = await asyncio.to_thread(
-        subprocess.run,
-        [PWM_PYTHON, "-c", script],
-        input=json.dumps(payload),
-        capture_output=True,
-        text=True,
-        timeout=90,
-        cwd=os.path.expanduser("~"),
-    )
-    if proc.returncode != 0:
-        stderr = (proc.stderr or proc.stdout or "").strip()
-        raise RuntimeError(f"perplexity library failed: {stderr[:300]}")
+    async def forward_event(event: dict):
+        if event.get("event") == "partial":
+            await research_progress.publish(session_id, {
+                "type": "research_partial",
+                "session_id": session_id,
+                "text": event.get("text") or "",
+                "replace": bool(event.get("replace")),
+            })
+        elif event.get("event") == "sources":
+            await research_progress.publish(session_id, {
+                "type": "research_sources",
+                "session_id": session_id,
+                "sources": (event.get("search_results") or [])[:8],
+            })
 
-    data = json.loads(proc.stdout)
+    print(f"🚀 [PerplexityLib] Querying session={session_id} continue={continue_session}: {query}")
+    data = await perplexity_workers.ask(payload, on_event=forward_event)
     answer = data.get("answer") or ""
     results = data.get("search_results") or []
     asset_urls = data.get("asset_urls") or []
@@ -655,14 +2429,14 @@ client.close()
     if not answer:
         return None
 
-    perplexity_sessions[session_id] = {
+    perplexity_sessions.put(session_id, {
         "backend_uuid": data.get("backend_uuid"),
         "read_write_token": data.get("read_write_token"),
         "answer": answer,
         "search_results": results,
         "asset_urls": asset_urls,
-    }
-    return render_perplexity_result(
+    }, owner)
+    return perplexity_card(
         query,
         answer,
         citations,
@@ -732,7 +2506,7 @@ class DuckDuckGoHTMLParser(HTMLParser):
         lowered = href.lower()
         return any(marker in lowered for marker in ["ad_domain=", "bing.com/aclick", "/y.js"])
 
-async def brave_search_screenshot(query: str):
+async def brave_search(query: str):
     if not BRAVE_SEARCH_API_KEY:
         return None
     url = "https://api.search.brave.com/res/v1/web/search"
@@ -748,10 +2522,9 @@ async def brave_search_screenshot(query: str):
         "search_lang": "pt-br",
         "safesearch": "moderate",
     }
-    async with httpx.AsyncClient(timeout=12) as http:
-        response = await http.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        data = response.json()
+    response = await http_clients.get().get(url, headers=headers, params=params, timeout=12)
+    response.raise_for_status()
+    data = response.json()
     items = []
     for result in data.get("web", {}).get("results", [])[:8]:
         snippets = [result.get("description", "")]
@@ -761,9 +2534,9 @@ async def brave_search_screenshot(query: str):
             "link": result.get("url"),
             "snippet": " ".join(s for s in snippets if s),
         })
-    return render_search_results(query, "brave_search_api", items), False
+    return search_card(query, "brave_search_api", items), False
 
-async def google_cse_screenshot(query: str):
+async def google_cse_search(query: str):
     if not GOOGLE_CSE_API_KEY or not GOOGLE_CSE_CX:
         return None
     url = "https://www.googleapis.com/customsearch/v1"
@@ -773,46 +2546,391 @@ async def google_cse_screenshot(query: str):
         "q": query,
         "num": 8,
     }
-    async with httpx.AsyncClient(timeout=12) as http:
-        response = await http.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
+    response = await http_clients.get().get(url, params=params, timeout=12)
+    response.raise_for_status()
+    data = response.json()
     items = data.get("items", [])
-    return render_search_results(query, "google_programmable_search", items), False
+    return search_card(query, "google_programmable_search", items), False
 
-async def duckduckgo_html_screenshot(query: str):
+async def duckduckgo_html_search(query: str):
     url = "https://html.duckduckgo.com/html/"
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
         "Accept": "text/html,application/xhtml+xml",
         "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8",
     }
-    async with httpx.AsyncClient(timeout=12, follow_redirects=True) as http:
-        response = await http.get(url, params={"q": query, "kl": "br-pt"}, headers=headers)
-        response.raise_for_status()
-        parser = DuckDuckGoHTMLParser()
-        parser.feed(response.text)
+    response = await http_clients.get().get(
+        url, params={"q": query, "kl": "br-pt"}, headers=headers, timeout=12, follow_redirects=True
+    )
+    response.raise_for_status()
+    parser = DuckDuckGoHTMLParser()
+    parser.feed(response.text)
     if not parser.items:
         return None
-    return render_search_results(query, "duckduckgo_html", parser.items), False
+    return search_card(query, "duckduckgo_html", parser.items), False
+
+class ResultCache:
+    """TTL + LRU cache for rendered search results, bounded by the approximate bytes it holds."""
+
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        self._entries: collections.OrderedDict[tuple, dict] = collections.OrderedDict()
+        self._max_bytes = max_bytes
+        self._ttl = ttl_seconds
+        self._bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "bypassed": 0, "stores": 0, "evictions": 0, "expired": 0}
+
+    def get(self, key: tuple) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry["expires_at"] <= time.monotonic():
+            self._drop(key)
+            self.stats["expired"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: tuple, value: dict):
+        size = len(json.dumps(value, ensure_ascii=False, default=str))
+        if size > self._max_bytes:
+            return
+        self._drop(key)
+        self._entries[key] = {**value, "size": size, "expires_at": time.monotonic() + self._ttl}
+        self._bytes += size
+        self.stats["stores"] += 1
+        while self._bytes > self._max_bytes and self._entries:
+            self._drop(next(iter(self._entries)))
+            self.stats["evictions"] += 1
+
+    def _drop(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._bytes -= entry["size"]
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def snapshot(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self._max_bytes,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else None,
+        }
 
-async def web_search_screenshot(query: str, session_id: str = "", continue_session: bool = False):
-    providers = [
-        ("perplexity_web", lambda q: perplexity_web_screenshot(q, session_id, continue_session)),
-        ("google_programmable_search", google_cse_screenshot),
-        ("brave_search_api", brave_search_screenshot),
-        ("duckduckgo_html", duckduckgo_html_screenshot),
-    ]
-    for provider, fn in providers:
+search_cache = ResultCache(SEARCH_CACHE_MAX_BYTES, SEARCH_CACHE_TTL_SECONDS)
+
+def normalize_search_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query or "").strip().lower()
+
+class ProviderRace:
+    """Hedged search: starts the next provider when the current one is slow or fails, first usable result wins.
+
+    The hedge delay for each provider follows the p95 of its recent successful latencies once there are
+    enough samples, clamped to SEARCH_HEDGE_MIN/MAX_DELAY_SECONDS; before that SEARCH_HEDGE_DELAY_SECONDS applies.
+    """
+
+    def __init__(self):
+        self.latency_ms: dict[str, LatencyWindow] = collections.defaultdict(LatencyWindow)
+        self.stats: dict[str, dict] = collections.defaultdict(lambda: {"wins": 0, "empty": 0, "failures": 0, "cancelled": 0})
+        self.hedges = 0
+
+    def hedge_delay(self, provider: str) -> float:
+        window = self.latency_ms.get(provider)
+        if window is None or window.count < SEARCH_HEDGE_MIN_SAMPLES:
+            return SEARCH_HEDGE_DELAY_SECONDS
+        return min(SEARCH_HEDGE_MAX_DELAY_SECONDS, max(SEARCH_HEDGE_MIN_DELAY_SECONDS, window.percentile(0.95) / 1000))
+
+    async def _timed(self, provider: str, fn, query: str):
+        started = time.perf_counter()
         try:
             result = await fn(query)
-            if result:
-                print(f"✅ [SearchAPI] {provider} returned real results.")
-                return result
-        except Exception as e:
-            print(f"⚠️ [SearchAPI] {provider} failed: {e}")
+        except asyncio.CancelledError:
+            self.stats[provider]["cancelled"] += 1
+            raise
+        if result:
+            self.latency_ms[provider].add((time.perf_counter() - started) * 1000)
+        return result
+
+    async def run(self, providers: list[tuple[str, object]], query: str):
+        if not SEARCH_HEDGE_ENABLED:
+            for provider, fn in providers:
+                try:
+                    result = await self._timed(provider, fn, query)
+                    if result:
+                        self.stats[provider]["wins"] += 1
+                        return provider, result
+                    self.stats[provider]["empty"] += 1
+                except Exception as e:
+                    self.stats[provider]["failures"] += 1
+                    print(f"⚠️ [SearchAPI] {provider} failed: {e}")
+            return None
+
+        pending: dict[asyncio.Task, int] = {}
+        next_index = 0
+        launched_at = 0.0
+
+        def launch():
+            nonlocal next_index, launched_at
+            provider, fn = providers[next_index]
+            if next_index:
+                self.hedges += 1
+                print(f"🔀 [SearchAPI] Hedging with {provider}")
+            pending[asyncio.create_task(self._timed(provider, fn, query))] = next_index
+            next_index += 1
+            launched_at = time.monotonic()
+
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if next_index < len(providers):
+                    delay = self.hedge_delay(providers[next_index - 1][0])
+                    timeout = max(0.0, launched_at + delay - time.monotonic())
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    launch()
+                    continue
+                winners = []
+                for task in done:
+                    index = pending.pop(task)
+                    provider = providers[index][0]
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        self.stats[provider]["failures"] += 1
+                        print(f"⚠️ [SearchAPI] {provider} failed: {e}")
+                        continue
+                    if result:
+                        winners.append((index, result))
+                    else:
+                        self.stats[provider]["empty"] += 1
+                if winners:
+                    index, result = min(winners, key=lambda item: item[0])
+                    self.stats[providers[index][0]]["wins"] += 1
+                    return providers[index][0], result
+                if next_index < len(providers):
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        return None
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": SEARCH_HEDGE_ENABLED,
+            "hedges": self.hedges,
+            "providers": {
+                provider: {
+                    **self.stats[provider],
+                    "latency_ms": self.latency_ms[provider].snapshot(),
+                    "hedge_delay_seconds": round(self.hedge_delay(provider), 1),
+                }
+                for provider in sorted(set(self.stats) | set(self.latency_ms))
+            },
+        }
+
+provider_race = ProviderRace()
+
+# Only what the HUD displays is cached with a result: Perplexity conversation handles (backend_uuid,
+# read_write_token) and earlier pwm turns stay in the session that created them, so a cache hit can't read or
+# continue another client's thread.
+SEARCH_CACHE_SESSION_FIELDS = ("search_results", "asset_urls")
+
+def shareable_session(payload):
+    if isinstance(payload, dict):
+        return {field: copy.deepcopy(payload[field]) for field in SEARCH_CACHE_SESSION_FIELDS if field in payload}
+    if isinstance(payload, list):
+        return copy.deepcopy(payload[-1:])
     return None
 
+async def web_search(query: str, session_id: str = "", continue_session: bool = False, owner: str = ""):
+    """Returns (card, is_blocked) where card is the structured result; see render_card for the image form."""
+    providers = [
+        ("perplexity_web", lambda q: perplexity_web_search(q, session_id, continue_session, owner)),
+        ("google_programmable_search", google_cse_search),
+        ("brave_search_api", brave_search),
+        ("duckduckgo_html", duckduckgo_html_search),
+    ]
+    normalized = normalize_search_query(query)
+    cacheable = not wants_generated_image(query) and not (continue_session and session_id in perplexity_sessions)
+    if cacheable:
+        for provider, _ in providers:
+            entry = search_cache.get((provider, normalized))
+            if entry:
+                search_cache.stats["hits"] += 1
+                if entry["payload"] is not None:
+                    perplexity_sessions.put(session_id, shareable_session(entry["payload"]), owner)
+                print(f"✅ [SearchCache] {provider} hit for: {query}")
+                card = entry["card"]
+                if card["kind"] == "perplexity":
+                    card = {**card, "session_id": session_id, "continued": continue_session}
+                return card, entry["is_blocked"]
+        search_cache.stats["misses"] += 1
+    else:
+        search_cache.stats["bypassed"] += 1
+
+    outcome = await provider_race.run(providers, query)
+    if not outcome:
+        return None
+    provider, result = outcome
+    print(f"✅ [SearchAPI] {provider} returned real results.")
+    if cacheable:
+        payload = perplexity_sessions.get(session_id) if provider == "perplexity_web" else None
+        search_cache.put((provider, normalized), {
+            "card": result[0],
+            "is_blocked": result[1],
+            "payload": shareable_session(payload),
+        })
+    return result
+
+async def web_search_screenshot(query: str, session_id: str = "", continue_session: bool = False, owner: str = ""):
+    result = await web_search(query, session_id, continue_session, owner)
+    if not result:
+        return None
+    card, is_blocked = result
+    return await render_pool.render(render_card, card), is_blocked
+
+class ResearchQueue:
+    """Bounded worker pool for searches and browser captures.
+
+    Jobs are ordered by priority (interactive before watch-triggered) and, within a priority, round-robin across
+    owners: each owner's next job is stamped one round after its previous one (never behind the round being
+    served), so a HUD client firing several searches queues behind, not in front of, another client's first one.
+    Identical in-flight keys share one future, and callers simply await the result while the WebSocket loop keeps
+    serving other commands. Each shared future counts its waiters; when the last one is cancelled the job is
+    dropped if still queued, or its running task is cancelled.
+    """
+
+    def __init__(self, workers: int, max_depth: int):
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self._waiters: dict[asyncio.Future, int] = {}
+        self._running: dict[asyncio.Future, asyncio.Task] = {}
+        self._workers: list[asyncio.Task] = []
+        self._sequence = itertools.count()
+        self._rounds: dict[str, int] = {}
+        self._served_round = 0
+        self._size = workers
+        self._max_depth = max_depth
+        self._busy = 0
+        self.wait_ms = LatencyWindow()
+        self.run_ms = LatencyWindow()
+        self.stats = {"submitted": 0, "coalesced": 0, "rejected": 0, "completed": 0, "failed": 0, "abandoned": 0}
+
+    def start(self):
+        self._workers = [task for task in self._workers if not task.done()]
+        while len(self._workers) < self._size:
+            self._workers.append(asyncio.create_task(self._worker()))
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for future in self._inflight.values():
+            if not future.done():
+                future.cancel()
+        self._inflight.clear()
+        self._waiters.clear()
+        self._running.clear()
+        self._rounds.clear()
+
+    async def submit(self, key: tuple, factory, priority: int = RESEARCH_PRIORITY_INTERACTIVE, owner: str = ""):
+        self.start()
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+        else:
+            if self._queue.qsize() >= self._max_depth:
+                self.stats["rejected"] += 1
+                raise RuntimeError("research queue is full, try again shortly")
+            future = asyncio.get_running_loop().create_future()
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self._inflight[key] = future
+            self.stats["submitted"] += 1
+            turn = max(self._rounds.get(owner, 0), self._served_round)
+            self._rounds[owner] = turn + 1
+            self._queue.put_nowait((priority, turn, next(self._sequence), time.monotonic(), key, factory, future))
+        self._waiters[future] = self._waiters.get(future, 0) + 1
+        try:
+            return await asyncio.shield(future)
+        finally:
+            self._waiters[future] -= 1
+            if not self._waiters[future]:
+                del self._waiters[future]
+                if not future.done():
+                    self._abandon(key, future)
+
+    def _abandon(self, key: tuple, future: asyncio.Future):
+        self.stats["abandoned"] += 1
+        if self._inflight.get(key) is future:
+            self._inflight.pop(key, None)
+        future.cancel()
+        job = self._running.get(future)
+        if job is not None:
+            job.cancel()
+
+    async def _worker(self):
+        while True:
+            _, turn, _, queued_at, key, factory, future = await self._queue.get()
+            if turn > self._served_round:
+                self._served_round = turn
+                self._rounds = {owner: next_turn for owner, next_turn in self._rounds.items() if next_turn > turn}
+            if future.done():
+                # Every waiter left while the job was queued.
+                self._queue.task_done()
+                continue
+            started = time.monotonic()
+            self.wait_ms.add((started - queued_at) * 1000)
+            self._busy += 1
+            job = self._running[future] = asyncio.create_task(factory())
+            try:
+                # wait() does not forward this worker's cancellation, so the job is cancelled explicitly below.
+                await asyncio.wait({job})
+                result = job.result()
+            except asyncio.CancelledError:
+                if not job.done():
+                    job.cancel()
+                    if not future.done():
+                        future.cancel()
+                    raise
+                if not future.done():
+                    future.cancel()
+            except Exception as e:
+                self.stats["failed"] += 1
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                self.stats["completed"] += 1
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self._busy -= 1
+                self._running.pop(future, None)
+                self.run_ms.add((time.monotonic() - started) * 1000)
+                if self._inflight.get(key) is future:
+                    self._inflight.pop(key, None)
+                self._queue.task_done()
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "workers": self._size,
+            "busy": self._busy,
+            "depth": self._queue.qsize(),
+            "owners": len(self._rounds),
+            "wait_ms": self.wait_ms.snapshot(),
+            "run_ms": self.run_ms.snapshot(),
+        }
+
+research_queue = ResearchQueue(RESEARCH_WORKERS, RESEARCH_QUEUE_MAX_DEPTH)
+
 def load_cookie_file():
     cookie_file = next((p for p in COOKIE_FILE_CANDIDATES if os.path.exists(p) and os.path.getsize(p) > 0), None)
     if not cookie_file:
@@ -855,70 +2973,128 @@ async def apply_user_cookies(browser_context):
     except Exception as e:
         print(f"⚠️ [Cookies] Could not apply cookies: {e}")
 
+async def run_hud_research(ws: WebSocket, client_id: str, query: str, engine: str, session_id: str, continue_session: bool, result_format: str = "image"):
+    label = "WEB_SEARCH" if engine in {"google", "web"} else engine.upper()
+    if not await send_ws_json(ws, {"type": "status_update", "message": f"AGENT: RESEARCHING_{label}"}):
+        return
+    try:
+        if engine in {"google", "web"}:
+            if not await send_ws_json(ws, {"type": "status_update", "message": f"SESSION: {session_id} // {'CONTINUE' if continue_session else 'NEW'}"}):
+                return
+            image_intent = wants_generated_image(query)
+            if image_intent:
+                if not await send_ws_json(ws, {"type": "status_update", "message": "SYS: TRYING_IMAGE_ASSET"}):
+                    return
+                if not await send_ws_json(ws, {"type": "status_update", "message": "SYS: RESOLVING_GENERATED_ASSET_URL"}):
+                    return
+            research_progress.subscribe(session_id, ws)
+            try:
+                api_result = await research_queue.submit(
+                    ("web", query, session_id, continue_session),
+                    lambda: web_search(query, session_id, continue_session, client_id),
+                    owner=client_id,
+                )
+            finally:
+                research_progress.unsubscribe(session_id, ws)
+        else:
+            api_result = None
+
+        card = None
+        segments = []
+        streamed = set()
+
+        async def send_segment(data: bytes, index: int, total: int) -> bool:
+            streamed.add(index)
+            return await send_result_image(ws, image=data, meta={"segment": index, "segments": total}, preview=index == 0)
+
+        if api_result:
+            card, is_blocked = api_result
+        else:
+            segments, is_blocked = await research_queue.submit(
+                ("browser", engine, query), lambda: capture_screenshot(engine, query, client_id, send_segment), owner=client_id
+            )
+
+        if is_blocked and engine in {"google", "web"}:
+            if not await send_ws_json(ws, {"type": "status_update", "message": "WARN: GOOGLE_BLOCK_DETECTED"}):
+                return
+            if not await send_ws_json(ws, {"type": "status_update", "message": "SYS: REROUTING_REAL_SEARCH..."}):
+                return
+            card = None
+            streamed.clear()
+            segments, is_blocked = await research_queue.submit(
+                ("browser", "yahoo", query), lambda: capture_screenshot("yahoo", query, client_id, send_segment), owner=client_id
+            )
+        elif is_blocked:
+            if not await send_ws_json(ws, {"type": "status_update", "message": "WARN: VERIFICATION_REQUIRED"}):
+                return
+        if card is not None and result_format == "structured":
+            if not await send_ws_json(ws, {"type": "research_result", "result": card}):
+                return
+        elif card is not None:
+            if not await send_result_image(ws, card=card):
+                return
+        else:
+            # Tiles the capture already streamed to this socket are not sent twice; coalesced callers get them all.
+            for index, data in enumerate(segments):
+                if index not in streamed and not await send_segment(data, index, len(segments)):
+                    return
+        session_data = perplexity_sessions.get(session_id) if engine in {"google", "web"} else None
+        if isinstance(session_data, dict):
+            sources = session_data.get("search_results") or []
+            if sources:
+                if not await send_ws_json(ws, {"type": "research_sources", "sources": sources[:8]}):
+                    return
+            asset_urls = session_data.get("asset_urls") or []
+            if asset_urls:
+                if not await send_ws_json(ws, {"type": "generated_assets", "assets": asset_urls[:3]}):
+                    return
+                await send_ws_json(ws, {"type": "status_update", "message": "ASSET: GENERATED_IMAGE_READY"})
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"❌ [Error] Research failed: {e}")
+        await send_ws_json(ws, {"type": "status_update", "message": f"ERROR: {str(e)[:100]}"})
+
 @app.websocket("/ws/hud")
 async def websocket_hud(ws: WebSocket):
     global cognitive_memory
     await ws.accept()
     hud_connections.add(ws)
+    research_tasks: set[asyncio.Task] = set()
+    client_id = uuid.uuid4().hex[:8]
+    result_format = "image"
     try:
         while True:
             data = await ws.receive_json()
-            if data.get("type") == "command":
+            if data.get("type") == "hello":
+                if data.get("result_format") in RESULT_FORMATS:
+                    result_format = data["result_format"]
+                client_id = hud_client_id(data.get("hud_id")) or client_id
+                hud_client = hud_clients.setdefault(ws, HudClient())
+                hud_client.binary_frames = bool(data.get("binary_frames"))
+                hud_client.artifact_urls = bool(data.get("artifact_urls")) and artifact_store.enabled
+                if isinstance(data.get("image_formats"), list):
+                    hud_client.image_profile = image_profile(str(data.get("client_type") or "desktop"), data["image_formats"])
+                if not await send_ws_json(ws, {
+                    "type": "hello_ack",
+                    "result_format": result_format,
+                    "result_formats": sorted(RESULT_FORMATS),
+                    "binary_frames": hud_client.binary_frames,
+                    "artifact_urls": hud_client.artifact_urls,
+                    "image_profile": hud_client.image_profile,
+                }):
+                    break
+            elif data.get("type") == "command":
                 cmd = data.get("command")
                 query = data.get("query")
                 engine = data.get("engine", "google")
                 session_id = data.get("session_id") or str(uuid.uuid4())[:8]
                 continue_session = bool(data.get("continue_session"))
+                command_format = data.get("result_format") if data.get("result_format") in RESULT_FORMATS else result_format
                 if cmd == "analyze_and_search" and query:
-                    label = "WEB_SEARCH" if engine in {"google", "web"} else engine.upper()
-                    if not await send_ws_json(ws, {"type": "status_update", "message": f"AGENT: RESEARCHING_{label}"}):
-                        break
-                    try:
-                        if engine in {"google", "web"}:
-                            if not await send_ws_json(ws, {"type": "status_update", "message": f"SESSION: {session_id} // {'CONTINUE' if continue_session else 'NEW'}"}):
-                                break
-                            image_intent = wants_generated_image(query)
-                            if image_intent:
-                                if not await send_ws_json(ws, {"type": "status_update", "message": "SYS: TRYING_IMAGE_ASSET"}):
-                                    break
-                                if not await send_ws_json(ws, {"type": "status_update", "message": "SYS: RESOLVING_GENERATED_ASSET_URL"}):
-                                    break
-                            api_result = await web_search_screenshot(query, session_id, continue_session)
-                        else:
-                            api_result = None
-
-                        if api_result:
-                            img_data, is_blocked = api_result
-                        else:
-                            img_data, is_blocked = await capture_screenshot(engine, query)
-
-                        if is_blocked and engine in {"google", "web"}:
-                            if not await send_ws_json(ws, {"type": "status_update", "message": "WARN: GOOGLE_BLOCK_DETECTED"}):
-                                break
-                            if not await send_ws_json(ws, {"type": "status_update", "message": "SYS: REROUTING_REAL_SEARCH..."}):
-                                break
-                            img_data, is_blocked = await capture_screenshot("yahoo", query)
-                        elif is_blocked:
-                            if not await send_ws_json(ws, {"type": "status_update", "message": "WARN: VERIFICATION_REQUIRED"}):
-                                break
-                        if not await send_ws_json(ws, {"type": "browser_screenshot", "data": img_data}):
-                            break
-                        if engine in {"google", "web"} and session_id in perplexity_sessions:
-                            session_data = perplexity_sessions.get(session_id, {})
-                            sources = session_data.get("search_results") or []
-                            if sources:
-                                if not await send_ws_json(ws, {"type": "research_sources", "sources": sources[:8]}):
-                                    break
-                            asset_urls = session_data.get("asset_urls") or []
-                            if asset_urls:
-                                if not await send_ws_json(ws, {"type": "generated_assets", "assets": asset_urls[:3]}):
-                                    break
-                                if not await send_ws_json(ws, {"type": "status_update", "message": "ASSET: GENERATED_IMAGE_READY"}):
-                                    break
-                    except Exception as e:
-                        print(f"❌ [Error] Research failed: {e}")
-                        if not await send_ws_json(ws, {"type": "status_update", "message": f"ERROR: {str(e)[:100]}"}):
-                            break
+                    task = asyncio.create_task(run_hud_research(ws, client_id, query, engine, session_id, continue_session, command_format))
+                    research_tasks.add(task)
+                    task.add_done_callback(research_tasks.discard)
                 elif cmd == "start_watch" and query:
                     try:
                         target = normalize_watch_target(query)
@@ -927,22 +3103,26 @@ async def websocket_hud(ws: WebSocket):
                             break
                         continue
                     await stop_watch(ws, "WATCH_REPLACED")
-                    watch_tasks[ws] = asyncio.create_task(watch_target_loop(ws, target))
+                    await watch_scheduler.subscribe(ws, target)
                     if not await send_ws_json(ws, {"type": "status_update", "message": f"WATCHTOWER: ACTIVE {target}"}):
                         break
                 elif cmd == "stop_watch":
                     await stop_watch(ws, "WATCHTOWER: STOPPED")
                 elif cmd == "close_browser":
                     cognitive_memory = []
-                    perplexity_sessions.clear()
-                    await stop_watch(ws, "WATCHTOWER: PURGED")
+                    perplexity_sessions.clear(client_id)
+                    search_cache.clear()
+                    await stop_watch(ws, "WATCHTOWER: PURGED", forget=True)
                     if not await send_ws_json(ws, {"type": "status_update", "message": "SYSTEM_CORE: MEMORY_PURGED"}):
                         break
     except WebSocketDisconnect:
         hud_connections.discard(ws)
     finally:
+        for task in list(research_tasks):
+            task.cancel()
         await stop_watch(ws, "WATCHTOWER: DISCONNECTED")
         hud_connections.discard(ws)
+        hud_clients.pop(ws, None)
 
 @app.websocket("/ws/vision")
 async def websocket_vision(ws: WebSocket):
@@ -960,16 +3140,17 @@ async def type_human_like(page, selector, text, click_after=None):
     await page.wait_for_selector(selector, timeout=30000)
     await page.mouse.move(random.randint(100, 700), random.randint(100, 700))
     await page.click(selector)
-    await asyncio.sleep(random.uniform(1.0, 2.0))
+    await asyncio.sleep(random.uniform(0.3, 0.8))
     for char in text:
         await page.keyboard.type(char, delay=random.randint(60, 200))
-    await asyncio.sleep(random.uniform(2.0, 4.0)) 
-    
+
     if click_after:
         try:
+            # The send button only becomes clickable once the editor has taken the text.
             btn = await page.wait_for_selector(click_after, timeout=10000)
+            await btn.wait_for_element_state("enabled", timeout=10000)
             await btn.hover()
-            await asyncio.sleep(random.uniform(0.5, 1.2))
+            await asyncio.sleep(random.uniform(0.2, 0.5))
             await btn.click(force=True)
             print(f"✅ [UI] Master force click on {click_after}")
         except:
@@ -977,110 +3158,609 @@ async def type_human_like(page, selector, text, click_after=None):
     else:
         await page.keyboard.press("Enter")
 
-async def capture_screenshot(engine: str, query: str):
-    from playwright_stealth import Stealth
+def host_matches(host: str, domains: set[str]) -> bool:
+    return any(host == domain or host.endswith("." + domain) for domain in domains)
+
+class ProfileBroker:
+    """Owns the single persistent Chromium context on PLAYWRIGHT_USER_DATA_DIR.
+
+    Chromium locks a profile directory to one process, so the context is launched once under a lock and every
+    profile-engine capture runs as a tab inside it. At most BROWSER_PROFILE_MAX_TABS tabs are handed out at a
+    time; waiting captures are queued per client and a freed tab goes to the next client in round-robin
+    order, so one HUD session firing several searches cannot starve another.
+    """
+
+    def __init__(self, user_data_dir: str, max_tabs: int):
+        self._user_data_dir = user_data_dir
+        self._max_tabs = max_tabs
+        self._context = None
+        self._launch_lock: asyncio.Lock | None = None
+        self._active = 0
+        self._waiters: collections.OrderedDict[str, collections.deque] = collections.OrderedDict()
+        self.wait_ms = LatencyWindow()
+        self.stats = {"launches": 0, "launch_failures": 0, "granted": 0, "queued": 0, "max_depth": 0}
+
+    @property
+    def context(self):
+        return self._context
+
+    async def open(self, playwright, prepare, on_close):
+        """Return the profile context, launching it if needed; prepare() runs once per launch."""
+        if self._launch_lock is None:
+            self._launch_lock = asyncio.Lock()
+        async with self._launch_lock:
+            if self._context is not None:
+                return self._context
+            try:
+                context = await playwright.chromium.launch_persistent_context(
+                    self._user_data_dir, headless=True, args=BROWSER_ARGS, **BROWSER_CONTEXT_OPTIONS
+                )
+            except Exception:
+                self.stats["launch_failures"] += 1
+                raise
+            try:
+                await prepare(context, True)
+            except Exception:
+                await context.close()
+                raise
+
+            def closed(_):
+                if self._context is context:
+                    self._context = None
+                    on_close("profile", context)
+
+            context.on("close", closed)
+            self._context = context
+            self.stats["launches"] += 1
+            print("🧭 [Browser] Context 'profile' ready.")
+            return context
+
+    async def close(self):
+        context, self._context = self._context, None
+        if context is not None:
+            try:
+                await context.close()
+            except Exception:
+                pass
+
+    @asynccontextmanager
+    async def tab(self, owner: str):
+        queued = time.perf_counter()
+        if self._active < self._max_tabs and not self._depth():
+            self._active += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.setdefault(owner, collections.deque()).append(future)
+            self.stats["queued"] += 1
+            self.stats["max_depth"] = max(self.stats["max_depth"], self._depth())
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self._release()
+                raise
+        self.stats["granted"] += 1
+        self.wait_ms.add((time.perf_counter() - queued) * 1000)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self):
+        # Hand the tab straight to the oldest waiter of the next client in line instead of freeing it.
+        while self._waiters:
+            owner, queue = next(iter(self._waiters.items()))
+            future = queue.popleft()
+            if queue:
+                self._waiters.move_to_end(owner)
+            else:
+                del self._waiters[owner]
+            if not future.done():
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    def _depth(self) -> int:
+        return sum(1 for queue in self._waiters.values() for future in queue if not future.done())
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "max_tabs": self._max_tabs,
+            "active_tabs": self._active,
+            "depth": self._depth(),
+            "waiting_clients": sum(1 for queue in self._waiters.values() if any(not f.done() for f in queue)),
+            "open": self._context is not None,
+            "wait_ms": self.wait_ms.snapshot(),
+        }
+
+class BrowserPool:
+    """Keeps Chromium running between captures instead of launching it for every search.
+
+    Profile engines run as tabs in the ProfileBroker's persistent context; proxied google/web and the other
+    engines get their own context on a shared browser, capped at BROWSER_MAX_PAGES concurrent pages. Cookies
+    and stealth are applied once per context. Pages go back to an idle list after each capture and are closed
+    after BROWSER_PAGE_MAX_USES uses or BROWSER_PAGE_MAX_AGE_SECONDS. A crashed page is dropped, and a closed
+    context or disconnected browser is relaunched on the next request.
+    """
+
+    def __init__(self, max_pages: int, max_uses: int, max_age: float, profile: ProfileBroker):
+        self._max_pages = max_pages
+        self._max_uses = max_uses
+        self._max_age = max_age
+        self.profile = profile
+        self._playwright = None
+        self._browser = None
+        self._contexts: dict[str, object] = {}
+        self._idle: dict[str, list[dict]] = collections.defaultdict(list)
+        self._slots: asyncio.Semaphore | None = None
+        self._launch_lock: asyncio.Lock | None = None
+        self._prewarm_task: asyncio.Task | None = None
+        self._active: dict[object, tuple[str, dict]] = {}
+        self._stopping = False
+        self._in_use = 0
+        self.wait_ms = LatencyWindow()
+        self.stats = {
+            "browser_launches": 0,
+            "context_launches": 0,
+            "relaunches": 0,
+            "pages_created": 0,
+            "pages_reused": 0,
+            "pages_recycled": 0,
+            "crashes": 0,
+            "blocked": 0,
+            "trackers_blocked": 0,
+        }
+
+    @staticmethod
+    def context_key(engine: str) -> str:
+        if engine in BROWSER_PROXY_ENGINES and SEARCH_PROXY_FILE and os.path.exists(SEARCH_PROXY_FILE):
+            return "proxied"
+        return "profile" if engine in BROWSER_PROFILE_ENGINES else engine
+
+    def start(self):
+        self._stopping = False
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._max_pages)
+            self._launch_lock = asyncio.Lock()
+        if BROWSER_PREWARM and self._prewarm_task is None:
+            self._prewarm_task = asyncio.create_task(self._prewarm())
+
+    async def _prewarm(self):
+        try:
+            await self._context("profile")
+            print("✅ [Browser] Pool warmed up.")
+        except Exception as e:
+            print(f"⚠️ [Browser] Prewarm failed, launching on demand: {e}")
+
+    async def stop(self):
+        self._stopping = True
+        if self._prewarm_task is not None:
+            # Cancelling Playwright mid-launch leaves its driver process behind, so let the launch finish.
+            await asyncio.gather(self._prewarm_task, return_exceptions=True)
+            self._prewarm_task = None
+        contexts = list(self._contexts.values())
+        self._contexts.clear()
+        self._idle.clear()
+        await self.profile.close()
+        for context in contexts:
+            try:
+                await context.close()
+            except Exception:
+                pass
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+    async def _prepare(self, context, cookies: bool):
+        if cookies:
+            await apply_user_cookies(context)
+        from playwright_stealth import Stealth
+        await Stealth().apply_stealth_async(context)
+
+    async def _route(self, entry: dict, types: set[str], route, request):
+        host = (urlparse(request.url).hostname or "").lower()
+        if request.resource_type in types and not host_matches(host, BROWSER_ALLOW_DOMAINS):
+            entry["traffic"]["blocked"] += 1
+            self.stats["blocked"] += 1
+            await route.abort("blockedbyclient")
+            return
+        await route.continue_()
+
+    def _live_context(self, key: str):
+        return self.profile.context if key == "profile" else self._contexts.get(key)
+
+    async def _context(self, key: str):
+        self.start()
+        async with self._launch_lock:
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+        if key == "profile":
+            return await self.profile.open(self._playwright, self._prepare, self._on_context_closed)
+        async with self._launch_lock:
+            context = self._contexts.get(key)
+            if context is not None:
+                return context
+            if self._browser is None or not self._browser.is_connected():
+                self._browser = await self._playwright.chromium.launch(headless=True, args=BROWSER_ARGS)
+                self._browser.on("disconnected", self._on_browser_disconnected)
+                self.stats["browser_launches"] += 1
+            proxy = load_proxy_config() if key == "proxied" else None
+            context = await self._browser.new_context(proxy=proxy, **BROWSER_CONTEXT_OPTIONS)
+            try:
+                await self._prepare(context, key == "proxied")
+            except Exception:
+                await context.close()
+                raise
+            context.on("close", lambda _: self._on_context_closed(key, context))
+            self._contexts[key] = context
+            self.stats["context_launches"] += 1
+            print(f"🧭 [Browser] Context '{key}' ready.")
+            return context
+
+    def _on_context_closed(self, key: str, context):
+        if key != "profile":
+            if self._contexts.get(key) is not context:
+                return
+            del self._contexts[key]
+        self._idle.pop(key, None)
+        if not self._stopping:
+            self.stats["relaunches"] += 1
+            print(f"⚠️ [Browser] Context '{key}' closed; it will be relaunched on demand.")
+
+    def _on_browser_disconnected(self, browser):
+        if browser is self._browser:
+            self._browser = None
+            if not self._stopping:
+                self.stats["crashes"] += 1
+                print("⚠️ [Browser] Chromium disconnected; it will be relaunched on demand.")
+
+    async def reset(self, engine: str):
+        """Close the engine's context so the next capture starts fresh (e.g. with another proxy)."""
+        key = self.context_key(engine)
+        context = self._contexts.get(key)
+        if context is not None:
+            await context.close()
+
+    @asynccontextmanager
+    async def page(self, engine: str, owner: str = ""):
+        self.start()
+        key = self.context_key(engine)
+        queued = time.perf_counter()
+        async with (self.profile.tab(owner) if key == "profile" else self._slots):
+            self.wait_ms.add((time.perf_counter() - queued) * 1000)
+            entry = await self._acquire(key)
+            entry["traffic"] = {"bytes": 0, "requests": 0, "blocked": 0}
+            self._active[entry["page"]] = (engine, entry)
+            self._in_use += 1
+            healthy = False
+            handler = None
+            try:
+                types = BROWSER_RESOURCE_POLICIES.get(engine, BROWSER_RESOURCE_POLICIES["default"])
+                if BROWSER_BLOCKING_ENABLED and types:
+                    handler = functools.partial(self._route, entry, types)
+                    await entry["page"].route("**/*", handler)
+                yield entry["page"]
+                healthy = True
+            finally:
+                self._in_use -= 1
+                self._active.pop(entry["page"], None)
+                if handler is not None and not entry["page"].is_closed():
+                    try:
+                        await entry["page"].unroute("**/*", handler)
+                    except Exception:
+                        healthy = False
+                await self._release(key, entry, healthy)
+
+    def traffic(self, page) -> dict:
+        """Bytes, finished requests and blocked requests of the page's current capture."""
+        _, entry = self._active.get(page, (None, {"traffic": {}}))
+        return dict(entry["traffic"])
+
+    async def _acquire(self, key: str) -> dict:
+        context = await self._context(key)
+        idle = self._idle[key]
+        while idle:
+            entry = idle.pop()
+            if not entry["crashed"] and not entry["page"].is_closed():
+                self.stats["pages_reused"] += 1
+                return entry
+        page = await context.new_page()
+        entry = {"page": page, "context": context, "created_at": time.monotonic(), "uses": 0, "crashed": False}
+
+        def on_crash(_):
+            entry["crashed"] = True
+            self.stats["crashes"] += 1
+            print(f"⚠️ [Browser] Page crashed in context '{key}'.")
+
+        page.on("crash", on_crash)
+        try:
+            # Chromium reports the encoded (on-the-wire) size of every response over CDP.
+            cdp = await context.new_cdp_session(page)
+            await cdp.send("Network.enable")
+            cdp.on("Network.loadingFinished", lambda params: self._count_transfer(entry, params))
+            cdp.on("Network.loadingFailed", lambda params: self._count_blocked(entry, params))
+            if BROWSER_BLOCKING_ENABLED and BROWSER_TRACKER_URL_PATTERNS:
+                await cdp.send("Network.setBlockedURLs", {"urls": BROWSER_TRACKER_URL_PATTERNS})
+        except Exception as e:
+            print(f"⚠️ [Browser] Transfer metering or tracker blocking unavailable: {e}")
+        self.stats["pages_created"] += 1
+        return entry
+
+    def _count_blocked(self, entry: dict, params: dict):
+        traffic = entry.get("traffic")
+        if traffic is not None and params.get("blockedReason") == "inspector":
+            traffic["blocked"] += 1
+            self.stats["trackers_blocked"] += 1
+
+    @staticmethod
+    def _count_transfer(entry: dict, params: dict):
+        traffic = entry.get("traffic")
+        if traffic is not None:
+            traffic["bytes"] += int(params.get("encodedDataLength") or 0)
+            traffic["requests"] += 1
+
+    async def _release(self, key: str, entry: dict, healthy: bool):
+        entry["uses"] += 1
+        page = entry["page"]
+        fresh = entry["uses"] < self._max_uses and time.monotonic() - entry["created_at"] < self._max_age
+        live = self._live_context(key) is entry["context"]
+        if healthy and fresh and live and not entry["crashed"] and not page.is_closed():
+            try:
+                await page.goto("about:blank", timeout=5000)
+                self._idle[key].append(entry)
+                return
+            except Exception:
+                pass
+        self.stats["pages_recycled"] += 1
+        try:
+            await page.close()
+        except Exception:
+            pass
+
+    def snapshot(self) -> dict:
+        contexts = sorted(self._contexts) + (["profile"] if self.profile.context is not None else [])
+        return {
+            **self.stats,
+            "max_pages": self._max_pages,
+            "in_use": self._in_use,
+            "contexts": contexts,
+            "idle_pages": {key: len(pages) for key, pages in self._idle.items() if pages},
+            "browser_connected": self._browser is not None and self._browser.is_connected(),
+            "wait_ms": self.wait_ms.snapshot(),
+            "profile": self.profile.snapshot(),
+        }
+
+browser_pool = BrowserPool(
+    BROWSER_MAX_PAGES,
+    BROWSER_PAGE_MAX_USES,
+    BROWSER_PAGE_MAX_AGE_SECONDS,
+    ProfileBroker(PLAYWRIGHT_USER_DATA_DIR, BROWSER_PROFILE_MAX_TABS),
+)
+
+# Readiness is checked in the page: the answer selector is present, no "busy" element (stop button, spinner)
+# is left, and the DOM has not mutated for quiet_ms. Search pages additionally wait for the load event.
+BROWSER_READY_SCRIPT = """
+(spec) => {
+    const state = window.__omnilabReady || (window.__omnilabReady = {last: performance.now()});
+    if (!state.observer) {
+        state.observer = new MutationObserver(() => { state.last = performance.now(); });
+        state.observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+    }
+    if (spec.complete && document.readyState !== "complete") return false;
+    if (spec.answer && !document.querySelector(spec.answer)) return false;
+    if (spec.busy && document.querySelector(spec.busy)) return false;
+    return performance.now() - state.last >= spec.quiet_ms;
+}
+"""
+BROWSER_READY_SPECS = {
+    "gemini": {
+        "answer": "message-content, model-response .markdown",
+        "busy": "button[aria-label*='Stop'], .stop-icon, [data-test-id='thinking-indicator']",
+        "quiet_ms": BROWSER_READY_QUIET_MS,
+    },
+    "chatgpt": {
+        "answer": "[data-message-author-role='assistant'] .markdown",
+        "busy": "[data-testid='stop-button'], .result-streaming",
+        "quiet_ms": BROWSER_READY_QUIET_MS,
+    },
+    "perplexity": {
+        "answer": "[class*='prose']",
+        "busy": "button[aria-label*='Stop']",
+        "quiet_ms": BROWSER_READY_QUIET_MS,
+    },
+    "google": {"answer": "#search, #rso, #botstuff, #captcha-form, iframe[src*='recaptcha']", "complete": True, "quiet_ms": 500},
+    "yahoo": {"answer": "#web, #results, .searchCenterMiddle", "complete": True, "quiet_ms": 500},
+    "duckduckgo": {"answer": "#links, .results, .no-results", "complete": True, "quiet_ms": 500},
+    "default": {"complete": True, "quiet_ms": 800},
+}
+browser_ready_ms: dict[str, LatencyWindow] = collections.defaultdict(LatencyWindow)
+browser_ready_stats: dict[str, dict] = collections.defaultdict(lambda: {"ready": 0, "timeouts": 0})
+browser_load_ms: dict[str, LatencyWindow] = collections.defaultdict(LatencyWindow)
+browser_transfer_bytes: dict[str, LatencyWindow] = collections.defaultdict(LatencyWindow)
+browser_traffic_stats: dict[str, dict] = collections.defaultdict(lambda: {"captures": 0, "bytes": 0, "requests": 0, "blocked": 0})
+
+async def wait_until_ready(page, engine: str) -> bool:
+    """Wait for the engine's readiness condition, up to its BROWSER_READY_TIMEOUTS bound."""
+    spec = BROWSER_READY_SPECS.get("google" if engine == "web" else engine, BROWSER_READY_SPECS["default"])
+    timeout = BROWSER_READY_TIMEOUTS.get(engine, BROWSER_READY_TIMEOUTS["default"])
+    started = time.perf_counter()
+    try:
+        await page.wait_for_function(BROWSER_READY_SCRIPT, arg=spec, polling=250, timeout=timeout * 1000)
+        ready = True
+    except Exception as e:
+        ready = False
+        print(f"⚠️ [Browser] {engine.upper()} not ready after {timeout:g}s, capturing anyway: {str(e).splitlines()[0]}")
+    elapsed = (time.perf_counter() - started) * 1000
+    browser_ready_ms[engine].add(elapsed)
+    browser_ready_stats[engine]["ready" if ready else "timeouts"] += 1
+    if ready:
+        print(f"✅ [Browser] {engine.upper()} ready in {elapsed / 1000:.1f}s.")
+    return ready
+
+BROWSER_CAPTURE_SIZE_SCRIPT = """
+() => ({
+    width: document.documentElement.clientWidth,
+    height: Math.max(document.body ? document.body.scrollHeight : 0, document.documentElement.scrollHeight),
+})
+"""
+BROWSER_CAPTURE_CLIP_SCRIPT = """
+(selector) => {
+    const nodes = document.querySelectorAll(selector);
+    const node = nodes[nodes.length - 1];
+    if (!node) return null;
+    const rect = node.getBoundingClientRect();
+    return {x: rect.left + window.scrollX, y: rect.top + window.scrollY, width: rect.width, height: rect.height};
+}
+"""
+browser_capture_ms: dict[str, LatencyWindow] = collections.defaultdict(LatencyWindow)
+browser_capture_stats: dict[str, dict] = collections.defaultdict(lambda: {"captures": 0, "segments": 0, "bytes": 0})
+
+def capture_mode(engine: str) -> str:
+    if BROWSER_CAPTURE_MODE != "auto":
+        return BROWSER_CAPTURE_MODE
+    return "clip" if engine in {"gemini", "chatgpt", "perplexity"} else "tiles"
+
+async def capture_page(page, engine: str, on_segment=None) -> tuple[list[bytes], str]:
+    """Screenshot the page in the engine's capture mode; returns the JPEG segments and the mode actually used.
+
+    clip crops to the latest answer element, viewports crops the top BROWSER_CAPTURE_MAX_VIEWPORTS screens, and
+    tiles cuts the page into screen-sized segments, handing each to on_segment as soon as it is taken. Every
+    mode but full keeps the height (and so the rasterize/encode cost) bounded whatever the page length.
+    """
+    mode = capture_mode(engine)
+    if mode == "full":
+        return [await page.screenshot(type="jpeg", quality=75, full_page=True)], mode
+    viewport = page.viewport_size or BROWSER_CONTEXT_OPTIONS["viewport"]
+    size = await page.evaluate(BROWSER_CAPTURE_SIZE_SCRIPT)
+    width = max(1, min(size["width"] or viewport["width"], viewport["width"]))
+    height = max(1, size["height"])
+    max_height = viewport["height"] * BROWSER_CAPTURE_MAX_VIEWPORTS
+
+    if mode == "clip":
+        selector = BROWSER_READY_SPECS.get(engine, {}).get("answer")
+        box = await page.evaluate(BROWSER_CAPTURE_CLIP_SCRIPT, selector) if selector else None
+        if box and box["width"] >= 50 and box["height"] >= 50:
+            x, y = max(0, box["x"] - 16), max(0, box["y"] - 16)
+            clip = {"x": x, "y": y, "width": min(box["width"] + 32, width - x), "height": min(box["height"] + 32, max_height)}
+            return [await page.screenshot(type="jpeg", quality=75, full_page=True, clip=clip)], mode
+        mode = "viewports"
+
+    if mode == "tiles":
+        tile_height = viewport["height"] * BROWSER_CAPTURE_TILE_VIEWPORTS
+        total = min(-(-height // tile_height), BROWSER_CAPTURE_MAX_TILES)
+        deadline = time.monotonic() + BROWSER_CAPTURE_BUDGET_SECONDS
+        segments = []
+        for index in range(total):
+            if segments and time.monotonic() > deadline:
+                print(f"⚠️ [Browser] Capture budget spent after {len(segments)}/{total} tiles.")
+                break
+            top = index * tile_height
+            clip = {"x": 0, "y": top, "width": width, "height": min(tile_height, height - top)}
+            data = await page.screenshot(type="jpeg", quality=75, full_page=True, clip=clip)
+            segments.append(data)
+            if on_segment is not None:
+                await on_segment(data, index, total)
+        return segments, mode
+
+    clip = {"x": 0, "y": 0, "width": width, "height": min(height, max_height)}
+    return [await page.screenshot(type="jpeg", quality=75, full_page=True, clip=clip)], "viewports"
+
+async def capture_screenshot(engine: str, query: str, owner: str = "", on_segment=None):
     import urllib.parse
     quoted = urllib.parse.quote(query)
-    user_data_dir = PLAYWRIGHT_USER_DATA_DIR
-
-    async with async_playwright() as p:
-        stealth_params = {
-            "user_agent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
-            "locale": 'pt-BR',
-            "timezone_id": 'America/Sao_Paulo',
-            "geolocation": {'latitude': -23.5505, 'longitude': -46.6333},
-            "permissions": ['geolocation'],
-            "viewport": {'width': 1280, 'height': 800},
-        }
 
-        chromium_args = [
-            "--no-sandbox",
-            "--disable-blink-features=AutomationControlled",
-        ]
+    print(f"🚀 [Browser] Starting {engine.upper()} search for: {query}")
+    async with browser_pool.page(engine, owner) as page:
+        await page.mouse.move(400, 400)
+        await asyncio.sleep(random.uniform(0.5, 1.5))
 
-        proxy = load_proxy_config() if engine in ["google", "web"] else None
-        print(f"🚀 [Browser] Starting {engine.upper()} search for: {query}")
-        if engine in ["google", "web", "gemini", "chatgpt", "perplexity"]:
-            browser_context = await p.chromium.launch_persistent_context(
-                user_data_dir, headless=True, args=chromium_args, proxy=proxy, **stealth_params
-            )
-        else:
-            browser = await p.chromium.launch(headless=True, args=chromium_args, proxy=proxy)
-            browser_context = await browser.new_context(**stealth_params)
+        if engine == "gemini": target_url = "https://gemini.google.com/app"
+        elif engine == "chatgpt": target_url = "https://chatgpt.com/"
+        elif engine == "perplexity": target_url = f"https://www.perplexity.ai/search?q={quoted}"
+        elif engine == "duckduckgo": target_url = f"https://duckduckgo.com/html/?q={quoted}"
+        elif engine == "yahoo": target_url = f"https://search.yahoo.com/search?p={quoted}"
+        else: target_url = f"https://www.google.com/search?q={quoted}&hl=pt-BR"
 
+        print(f"🔎 [Browser] Navigating to {target_url}...")
+        nav_started = time.perf_counter()
         try:
-            page = browser_context.pages[0] if browser_context.pages else await browser_context.new_page()
-            if engine in ["google", "web", "gemini", "chatgpt", "perplexity"]:
-                await apply_user_cookies(browser_context)
-            await Stealth().apply_stealth_async(page)
-
-            await page.mouse.move(400, 400)
-            await asyncio.sleep(random.uniform(0.5, 1.5))
-
-            if engine == "gemini": target_url = "https://gemini.google.com/app"
-            elif engine == "chatgpt": target_url = "https://chatgpt.com/"
-            elif engine == "perplexity": target_url = f"https://www.perplexity.ai/search?q={quoted}"
-            elif engine == "duckduckgo": target_url = f"https://duckduckgo.com/html/?q={quoted}"
-            elif engine == "yahoo": target_url = f"https://search.yahoo.com/search?p={quoted}"
-            else: target_url = f"https://www.google.com/search?q={quoted}&hl=pt-BR"
-
-            print(f"🔎 [Browser] Navigating to {target_url}...")
-            try:
-                await page.goto(target_url, wait_until="domcontentloaded", timeout=50000)
-                print(f"✅ [Browser] Page loaded.")
-            except Exception as e:
-                print(f"⚠️ [Nav] Timeout or error during load: {e}. Capturing current page.")
+            await page.goto(target_url, wait_until="domcontentloaded", timeout=50000)
+            print(f"✅ [Browser] Page loaded.")
+        except Exception as e:
+            print(f"⚠️ [Nav] Timeout or error during load: {e}. Capturing current page.")
+        browser_load_ms[engine].add((time.perf_counter() - nav_started) * 1000)
 
-            if engine == "gemini":
-                try:
-                    gemini_send_btn = "button[aria-label*='Send'], .send-button-container button, div.send-button-container button"
-                    input_selector = "div[contenteditable='true']"
-                    await type_human_like(page, input_selector, query, click_after=gemini_send_btn)
-                    await asyncio.sleep(18)
+        if engine == "gemini":
+            try:
+                gemini_send_btn = "button[aria-label*='Send'], .send-button-container button, div.send-button-container button"
+                input_selector = "div[contenteditable='true']"
+                await type_human_like(page, input_selector, query, click_after=gemini_send_btn)
+                await wait_until_ready(page, engine)
+                answer_selectors = [
+                    "message-content",
+                    ".markdown",
+                    "div[role='presentation']",
+                    "main",
+                ]
+                for selector in answer_selectors:
                     try:
-                        await page.wait_for_load_state("networkidle", timeout=15000)
+                        await page.locator(selector).last.scroll_into_view_if_needed(timeout=4000)
+                        break
                     except Exception:
-                        pass
-                    answer_selectors = [
-                        "message-content",
-                        ".markdown",
-                        "div[role='presentation']",
-                        "main",
-                    ]
-                    for selector in answer_selectors:
-                        try:
-                            await page.locator(selector).last.scroll_into_view_if_needed(timeout=4000)
-                            break
-                        except Exception:
-                            continue
+                        continue
+                if capture_mode(engine) in {"full", "tiles"}:
+                    # Pull lazily rendered turns into the DOM before capturing the whole transcript.
                     for _ in range(5):
                         await page.mouse.wheel(0, 900)
                         await asyncio.sleep(0.7)
                     await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
                     await asyncio.sleep(2)
-                except Exception as e: print(f"⚠️ Gemini Error: {e}")
+            except Exception as e: print(f"⚠️ Gemini Error: {e}")
 
-            elif engine == "chatgpt":
-                try:
-                    input_selector = "#prompt-textarea"
-                    chatgpt_send_btn = "[data-testid='send-button']"
-                    await type_human_like(page, input_selector, query, click_after=chatgpt_send_btn)
-                    await asyncio.sleep(20)
-                except Exception as e: print(f"⚠️ ChatGPT Error: {e}")
-
-            elif engine == "perplexity":
-                await page.mouse.wheel(0, 500)
-                await asyncio.sleep(12)
-
-            else: await asyncio.sleep(5)
-
-            content = await page.content()
-            is_blocked = page_has_bot_check(content, page.url)
-
-            screenshot_bytes = await page.screenshot(type="jpeg", quality=75, full_page=True)
-            return base64.b64encode(screenshot_bytes).decode('utf-8'), is_blocked
-        finally:
-            await browser_context.close()
+        elif engine == "chatgpt":
+            try:
+                input_selector = "#prompt-textarea"
+                chatgpt_send_btn = "[data-testid='send-button']"
+                await type_human_like(page, input_selector, query, click_after=chatgpt_send_btn)
+                await wait_until_ready(page, engine)
+            except Exception as e: print(f"⚠️ ChatGPT Error: {e}")
+
+        elif engine == "perplexity":
+            await page.mouse.wheel(0, 500)
+            await wait_until_ready(page, engine)
+
+        else: await wait_until_ready(page, engine)
+
+        content = await page.content()
+        is_blocked = page_has_bot_check(content, page.url)
+
+        capture_started = time.perf_counter()
+        segments, mode = await capture_page(page, engine, None if is_blocked else on_segment)
+        browser_capture_ms[mode].add((time.perf_counter() - capture_started) * 1000)
+        traffic = browser_pool.traffic(page)
+    capture_stats = browser_capture_stats[mode]
+    capture_stats["captures"] += 1
+    capture_stats["segments"] += len(segments)
+    capture_stats["bytes"] += sum(len(segment) for segment in segments)
+    stats = browser_traffic_stats[engine]
+    stats["captures"] += 1
+    for field in ("bytes", "requests", "blocked"):
+        stats[field] += traffic.get(field, 0)
+    browser_transfer_bytes[engine].add(traffic.get("bytes", 0))
+    print(f"📦 [Browser] {engine.upper()} transferred {traffic.get('bytes', 0) / 1024:.0f} KB in {traffic.get('requests', 0)} requests, blocked {traffic.get('blocked', 0)}.")
+    if is_blocked and browser_pool.context_key(engine) == "proxied":
+        await browser_pool.reset(engine)
+    return segments, is_blocked
 
 async def _call_ai(image_bytes, history):
     if not client: return "API KEY ERROR"
@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import server
+
+ANSWER = """# Resumo
+Contexto: a busca retornou fontes recentes sobre o tema, com dados de preço e disponibilidade.
+- O fornecedor principal anunciou uma nova versão com melhorias de desempenho e consumo.
+- Analistas esperam que o preço caia nos próximos meses conforme a produção aumenta.
+- Há relatos de atraso na entrega em algumas regiões, principalmente fora das capitais.
+> Os números ainda são preliminares e podem mudar quando os relatórios oficiais forem publicados.
+1. Verifique a data de cada fonte antes de comparar valores.
+2. Prefira fontes primárias para especificações técnicas.
+""" * 3
+CITATIONS = [f"https://www.example{i}.com/noticias/2026/10/artigo-{i}" for i in range(6)]
+ITEMS = [
+    {"title": f"Resultado {i}: novidades e preços atualizados", "link": f"https://site{i}.com.br/pagina", "snippet": "Resumo do resultado com detalhes relevantes sobre o tema pesquisado. " * 3}
+    for i in range(8)
+]
+RENDERS = [
+    ("render_perplexity_result", lambda: server.render_perplexity_result("preço e disponibilidade", ANSWER, CITATIONS, {}, "bench", False)),
+    ("render_search_results", lambda: server.render_search_results("preço e disponibilidade", "duckduckgo_html", ITEMS)),
+]
+CACHES = [
+    server.resolve_font_path,
+    server.load_truetype,
+    server.default_font,
+    server.word_mask,
+    server.search_results_template,
+    server.perplexity_header_layer,
+    server.perplexity_footer_layer,
+]
+
+def measure(fn, rounds: int, cold: bool) -> float:
+    fn()
+    elapsed = 0.0
+    for _ in range(rounds):
+        if cold:
+            for cache in CACHES:
+                cache.cache_clear()
+        started = time.perf_counter()
+        fn()
+        elapsed += time.perf_counter() - started
+    return elapsed / rounds * 1000
+
+if __name__ == "__main__":
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(f"🧪 Render benchmark ({rounds} rounds each)")
+    for name, fn in RENDERS:
+        cold = measure(fn, rounds, cold=True)
+        warm = measure(fn, rounds, cold=False)
+        print(f"📊 {name}: cold caches {cold:.1f} ms // warm caches {warm:.1f} ms // {cold / warm:.1f}x")
@@ -0,0 +1,2 @@
+# Live scripts that drive a running server or a real browser; run them by hand, not under pytest.
+collect_ignore = ["test_agent.py", "test_perplexity_btn.py", "test_vision_pipeline.py"]
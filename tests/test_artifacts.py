@@ -0,0 +1,60 @@
+import asyncio
+import hashlib
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import server
+
+IMAGE = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = server.ArtifactStore(str(tmp_path / "artifacts"), 1 << 20)
+    asyncio.run(store.open())
+    monkeypatch.setattr(server, "artifact_store", store)
+    return store
+
+
+@pytest.mark.asyncio
+async def test_artifacts_are_content_addressed_and_evicted_lru(tmp_path):
+    store = server.ArtifactStore(str(tmp_path), 25_000)
+    first = await store.put(IMAGE)
+    assert first == hashlib.sha256(IMAGE).hexdigest()
+    assert await store.put(IMAGE) == first and store.stats["dedup_hits"] == 1
+    second = await store.put(IMAGE[::-1], "image/webp")
+    assert store.get(second)["path"].endswith(".webp")
+    store.get(first)
+    third = await store.put(IMAGE + b"!")
+    assert store.get(second) is None and store.get(first) is not None
+    assert not os.path.exists(os.path.join(str(tmp_path), second[:2], second + ".webp"))
+
+    reopened = server.ArtifactStore(str(tmp_path), 25_000)
+    await reopened.open()
+    assert reopened.snapshot()["entries"] == 2
+    assert reopened.get(first) and reopened.get(third) and reopened.get(second) is None
+
+
+def test_artifact_route_serves_etag_and_ranges(store):
+    artifact_id = asyncio.run(store.put(IMAGE))
+    client = TestClient(server.app)
+
+    full = client.get(f"/artifacts/{artifact_id}")
+    assert full.status_code == 200 and full.content == IMAGE
+    assert full.headers["etag"] == f'"{artifact_id}"'
+    assert "immutable" in full.headers["cache-control"]
+    assert full.headers["content-type"] == "image/jpeg"
+
+    cached = client.get(f"/artifacts/{artifact_id}", headers={"If-None-Match": f'"{artifact_id}"'})
+    assert cached.status_code == 304 and cached.content == b""
+
+    partial = client.get(f"/artifacts/{artifact_id}", headers={"Range": "bytes=100-199"})
+    assert partial.status_code == 206
+    assert partial.content == IMAGE[100:200]
+    assert partial.headers["content-range"] == f"bytes 100-199/{len(IMAGE)}"
+
+    assert client.get("/artifacts/" + "0" * 64).status_code == 404
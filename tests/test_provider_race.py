@@ -0,0 +1,37 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import server
+
+
+def provider(result, delay=0.0, error=None):
+    async def search(query):
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return result
+    return search
+
+
+@pytest.mark.asyncio
+async def test_provider_race_hedges_past_a_slow_provider(monkeypatch):
+    monkeypatch.setattr(server, "SEARCH_HEDGE_DELAY_SECONDS", 0.05)
+    race = server.ProviderRace()
+    outcome = await race.run([("slow", provider("slow", 5)), ("fast", provider("fast"))], "q")
+    assert outcome == ("fast", "fast")
+    assert race.hedges == 1
+    assert race.stats["slow"]["cancelled"] == 1
+
+
+@pytest.mark.asyncio
+async def test_provider_race_skips_failures_and_empty_results(monkeypatch):
+    monkeypatch.setattr(server, "SEARCH_HEDGE_DELAY_SECONDS", 5)
+    race = server.ProviderRace()
+    providers = [("broken", provider(None, error=RuntimeError("down"))), ("empty", provider(None)), ("ok", provider("ok"))]
+    assert await race.run(providers, "q") == ("ok", "ok")
+    assert race.stats["broken"]["failures"] == 1 and race.stats["empty"]["empty"] == 1
+    assert await race.run(providers[:2], "q") is None
@@ -0,0 +1,31 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import server
+
+
+@pytest.mark.asyncio
+async def test_json_stream_returns_the_first_complete_document():
+    stream = asyncio.StreamReader()
+    stream.feed_data(b'{"answer": "ok", "citations": ["https://exa')
+    stream.feed_data(b'mple.com"]}\n')
+    assert await server.read_json_stream(stream, 1 << 20) == {"answer": "ok", "citations": ["https://example.com"]}
+
+
+@pytest.mark.asyncio
+async def test_stderr_is_drained_into_a_bounded_tail():
+    stream = asyncio.StreamReader()
+    tail = bytearray()
+    drain = asyncio.create_task(server.drain_stream_tail(stream, tail, 4096))
+    for i in range(100):
+        stream.feed_data(f"warning {i:04d}\n".encode() * 400)
+        await asyncio.sleep(0)
+    stream.feed_data(b"Traceback: token expired\n")
+    stream.feed_eof()
+    await asyncio.wait_for(drain, 1)
+    assert len(tail) == 4096
+    assert tail.endswith(b"Traceback: token expired\n")
@@ -0,0 +1,210 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import server
+
+
+class FakeSocket:
+    def __init__(self):
+        self.messages = []
+
+    async def send_json(self, payload):
+        self.messages.append(payload)
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    queue = server.ResearchQueue(2, 32)
+    monkeypatch.setattr(server, "research_queue", queue)
+    return queue
+
+
+@pytest.mark.asyncio
+async def test_hud_research_serves_clients_round_robin(queue, monkeypatch):
+    started = []
+    release = asyncio.Event()
+
+    async def fake_capture(engine, query, owner="", on_segment=None):
+        started.append((owner, query))
+        await release.wait()
+        return [b"\xff\xd8jpeg"], False
+
+    monkeypatch.setattr(server, "capture_screenshot", fake_capture)
+    sockets = {"alice": FakeSocket(), "bob": FakeSocket()}
+    tasks = [
+        asyncio.create_task(server.run_hud_research(sockets["alice"], "alice", f"alice {i}", "gemini", "s-a", False))
+        for i in range(4)
+    ]
+    await asyncio.sleep(0.01)
+    tasks.append(asyncio.create_task(server.run_hud_research(sockets["bob"], "bob", "bob 0", "gemini", "s-b", False)))
+    await asyncio.sleep(0.01)
+    assert [owner for owner, _ in started] == ["alice", "alice"]
+
+    release.set()
+    await asyncio.gather(*tasks)
+    await queue.stop()
+    # Bob queued behind four of Alice's captures but runs before her remaining two.
+    assert [owner for owner, _ in started][2] == "bob"
+    assert [query for owner, query in started if owner == "alice"] == [f"alice {i}" for i in range(4)]
+    assert any(message.get("type") == "browser_screenshot" for message in sockets["bob"].messages)
+
+
+@pytest.mark.asyncio
+async def test_queue_priority_outranks_owner_rounds(queue):
+    order = []
+    gate = asyncio.Event()
+
+    def job(name):
+        async def run():
+            order.append(name)
+            await gate.wait()
+            return name
+        return run
+
+    blockers = [asyncio.create_task(queue.submit(("block", i), job(f"block {i}"), owner="alice")) for i in range(2)]
+    await asyncio.sleep(0.01)
+    watch = asyncio.create_task(queue.submit(("watch",), job("watch"), server.RESEARCH_PRIORITY_WATCH, owner="watch"))
+    busy = [asyncio.create_task(queue.submit(("alice", i), job(f"alice {i}"), owner="alice")) for i in range(3)]
+    late = asyncio.create_task(queue.submit(("bob",), job("bob"), owner="bob"))
+    await asyncio.sleep(0.01)
+    gate.set()
+    await asyncio.gather(*blockers, watch, *busy, late)
+    await queue.stop()
+    assert order[2:] == ["bob", "alice 0", "alice 1", "alice 2", "watch"]
+
+
+@pytest.mark.asyncio
+async def test_queue_coalesces_identical_keys():
+    queue = server.ResearchQueue(2, 32)
+    runs = []
+    gate = asyncio.Event()
+
+    async def search():
+        runs.append(1)
+        await gate.wait()
+        return "card"
+
+    callers = [asyncio.create_task(queue.submit(("web", "same"), search)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    callers[0].cancel()
+    gate.set()
+    assert await asyncio.gather(*callers[1:]) == ["card", "card"]
+    assert runs == [1]
+    assert queue.stats["submitted"] == 1 and queue.stats["coalesced"] == 2
+    await queue.submit(("web", "same"), search)
+    assert runs == [1, 1]
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_queue_runs_interactive_jobs_before_watch_jobs():
+    queue = server.ResearchQueue(1, 32)
+    order = []
+    gate = asyncio.Event()
+
+    def job(name):
+        async def run():
+            order.append(name)
+            await gate.wait()
+            return name
+        return run
+
+    blocker = asyncio.create_task(queue.submit(("block",), job("block")))
+    await asyncio.sleep(0.01)
+    watch = asyncio.create_task(queue.submit(("watch",), job("watch"), server.RESEARCH_PRIORITY_WATCH))
+    interactive = asyncio.create_task(queue.submit(("hud",), job("hud")))
+    await asyncio.sleep(0.01)
+    gate.set()
+    await asyncio.gather(blocker, watch, interactive)
+    assert order == ["block", "hud", "watch"]
+    assert queue.snapshot()["wait_ms"]["count"] == 3
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_queue_shares_failures_and_rejects_when_full():
+    queue = server.ResearchQueue(1, 1)
+    gate = asyncio.Event()
+
+    async def blocked():
+        await gate.wait()
+        raise RuntimeError("provider down")
+
+    first = asyncio.create_task(queue.submit(("a",), blocked))
+    await asyncio.sleep(0.01)
+    waiting = asyncio.create_task(queue.submit(("b",), blocked))
+    duplicate = asyncio.create_task(queue.submit(("b",), blocked))
+    await asyncio.sleep(0.01)
+    with pytest.raises(RuntimeError, match="queue is full"):
+        await queue.submit(("c",), blocked)
+    gate.set()
+    for task in (first, waiting, duplicate):
+        with pytest.raises(RuntimeError, match="provider down"):
+            await task
+    assert queue.stats["failed"] == 2 and queue.stats["rejected"] == 1
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_queue_drops_a_queued_job_when_its_only_waiter_leaves():
+    queue = server.ResearchQueue(1, 32)
+    gate = asyncio.Event()
+    runs = []
+
+    async def blocker():
+        await gate.wait()
+        return "block"
+
+    async def search():
+        runs.append(1)
+        return "card"
+
+    first = asyncio.create_task(queue.submit(("block",), blocker))
+    await asyncio.sleep(0.01)
+    waiter = asyncio.create_task(queue.submit(("web", "gone"), search))
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    await asyncio.sleep(0.01)
+    gate.set()
+    assert await first == "block"
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    await asyncio.sleep(0.01)
+    assert runs == []
+    assert queue.stats["abandoned"] == 1 and queue.snapshot()["depth"] == 0
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_queue_cancels_a_running_job_when_its_only_waiter_leaves():
+    queue = server.ResearchQueue(1, 32)
+    started = asyncio.Event()
+    cancelled = []
+
+    async def capture():
+        started.set()
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+
+    async def search():
+        return "card"
+
+    waiter = asyncio.create_task(queue.submit(("browser", "gone"), capture))
+    await started.wait()
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    await asyncio.sleep(0.01)
+    assert cancelled == [1]
+    assert queue.snapshot()["busy"] == 0
+    # The worker survives the cancelled job and serves the next one; the key is free again.
+    assert await queue.submit(("browser", "gone"), search) == "card"
+    assert queue.stats["abandoned"] == 1
+    await queue.stop()
@@ -0,0 +1,68 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import server
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(server.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_result_cache_ttl_lru_and_size_limits(clock):
+    cache = server.ResultCache(300, 60)
+    cache.put(("p", "a"), {"img_data": "a" * 100})
+    cache.put(("p", "b"), {"img_data": "b" * 100})
+    assert cache.get(("p", "a"))["img_data"] == "a" * 100
+    cache.put(("p", "c"), {"img_data": "c" * 100})
+    assert cache.get(("p", "b")) is None and cache.get(("p", "a")) is not None
+    cache.put(("p", "huge"), {"img_data": "x" * 400})
+    assert cache.get(("p", "huge")) is None and cache.stats["stores"] == 3
+    clock[0] += 61
+    assert cache.get(("p", "a")) is None
+    assert cache.stats["expired"] == 1
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    sessions = server.SessionStore(100, 1 << 20, 60, 10)
+    monkeypatch.setattr(server, "perplexity_sessions", sessions)
+    monkeypatch.setattr(server, "search_cache", server.ResultCache(1 << 20, 60))
+    monkeypatch.setattr(server, "provider_race", server.ProviderRace())
+    return sessions
+
+
+@pytest.mark.asyncio
+async def test_search_cache_hit_does_not_share_conversation_handles(sessions, monkeypatch):
+    calls = []
+
+    async def fake_perplexity(query, session_id, continue_session, owner=""):
+        calls.append(owner)
+        sessions.put(session_id, {
+            "backend_uuid": "uuid-alice",
+            "read_write_token": "token-alice",
+            "answer": "answer",
+            "search_results": [{"url": "https://example.com"}],
+            "asset_urls": [],
+        }, owner)
+        return server.perplexity_card(query, "answer", ["https://example.com"], {}, session_id, continue_session), False
+
+    monkeypatch.setattr(server, "perplexity_web_search", fake_perplexity)
+    await server.web_search("same question", "alice-session", False, "alice")
+    card, _ = await server.web_search("Same  question", "bob-session", False, "bob")
+
+    assert calls == ["alice"]
+    assert card["session_id"] == "bob-session"
+    assert sessions.get("bob-session") == {"search_results": [{"url": "https://example.com"}], "asset_urls": []}
+    assert sessions.get("alice-session")["read_write_token"] == "token-alice"
+
+
+def test_shareable_session_keeps_only_the_latest_pwm_turn():
+    history = [{"query": "private", "answer": "a"}, {"query": "shared", "answer": "b"}]
+    assert server.shareable_session(history) == [{"query": "shared", "answer": "b"}]
+    assert server.shareable_session(None) is None
@@ -0,0 +1,77 @@
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import server
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(server.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_session_store_expires_idle_sessions(clock):
+    store = server.SessionStore(100, 1 << 20, 60, 10)
+    store.put("a", {"answer": "x"}, "alice")
+    clock[0] += 45
+    assert store.get("a") == {"answer": "x"}
+    clock[0] += 45
+    assert "a" in store
+    clock[0] += 61
+    assert store.get("a") is None
+    assert store.stats["expired"] == 1
+
+
+def test_session_store_bounds_each_client_and_purges_by_owner():
+    store = server.SessionStore(100, 1 << 20, 60, 2)
+    for session_id in ("a1", "a2", "a3"):
+        store.put(session_id, [], "alice")
+    store.put("b1", [], "bob")
+    assert "a1" not in store and "a3" in store
+    store.put("a3", ["turn"])
+    store.clear("alice")
+    assert store.snapshot()["entries"] == 1 and "b1" in store
+    assert store.stats["purged"] == 2
+
+
+def test_session_store_evicts_least_recently_used_over_budget():
+    store = server.SessionStore(3, 1 << 20, 60, 10)
+    for session_id in ("s1", "s2", "s3"):
+        store.put(session_id, {}, session_id)
+    store.get("s1")
+    store.put("s4", {}, "s4")
+    assert "s2" not in store and "s1" in store
+    small = server.SessionStore(100, 200, 60, 10)
+    small.put("big", {"answer": "x" * 150}, "alice")
+    small.put("next", {"answer": "y" * 150}, "alice")
+    assert "big" not in small and small.snapshot()["bytes"] <= 200
+
+
+def test_shutdown_clears_sessions_from_earlier_sockets_of_the_same_hud(monkeypatch):
+    store = server.SessionStore(100, 1 << 20, 60, 10)
+    monkeypatch.setattr(server, "perplexity_sessions", store)
+    monkeypatch.setattr(server, "search_cache", server.ResultCache(1 << 20, 60))
+    hud_id = "0f6c1a52-9a3e-4c1e-9d55-2b7e8c4f1a90"
+    client = TestClient(server.app)
+    with client.websocket_connect("/ws/hud") as ws:
+        ws.send_json({"type": "hello", "hud_id": hud_id})
+        ws.receive_json()
+    store.put("earlier", {"answer": "x"}, hud_id)
+    store.put("other", {"answer": "y"}, "someone-else")
+    with client.websocket_connect("/ws/hud") as ws:
+        ws.send_json({"type": "hello", "hud_id": hud_id.upper()})
+        ws.receive_json()
+        ws.send_json({"type": "command", "command": "close_browser"})
+        assert ws.receive_json()["message"] == "SYSTEM_CORE: MEMORY_PURGED"
+    assert "earlier" not in store and "other" in store
+
+
+def test_hud_client_id_rejects_arbitrary_strings():
+    assert server.hud_client_id("ABCDEF12") == "abcdef12"
+    assert server.hud_client_id("../../etc") is None
+    assert server.hud_client_id(12345678) is None
@@ -0,0 +1,88 @@
+import os
+import random
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import server
+
+
+def page(words: int, seed: int = 7, edit_at: int | None = None) -> bytes:
+    rng = random.Random(seed)
+    vocabulary = [f"palavra{i}" for i in range(500)] + ["preço", "ação", "<p>", "</p>\n", "\t"]
+    tokens = [rng.choice(vocabulary) for _ in range(words)]
+    if edit_at is not None:
+        tokens[edit_at] = "EDITED"
+    return ("<html><head><title>Monitor  test</title></head><body>" + " ".join(tokens) + "</body></html>").encode("utf-8")
+
+
+def digest(body: bytes, chunk_size: int, **kwargs) -> server.StreamingPageDigest:
+    result = server.StreamingPageDigest("utf-8", **kwargs)
+    for start in range(0, len(body), chunk_size):
+        result.update(body[start:start + chunk_size])
+    result.update(b"", final=True)
+    return result
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096, 65536])
+def test_digest_does_not_depend_on_chunking(chunk_size):
+    body = page(20000)
+    reference = digest(body, len(body))
+    result = digest(body, chunk_size)
+    assert result.content_hash == server.page_fingerprint(body.decode("utf-8"))
+    assert result.blocks == reference.blocks
+    assert result.title == "Monitor test"
+    assert result.content_length == len(body)
+
+
+def test_digest_only_hashes_the_first_max_chars():
+    body = page(2000)
+    text = body.decode("utf-8")
+    result = digest(body, 999, max_chars=5000)
+    assert result.content_hash == server.page_fingerprint(text, 5000)
+    assert result.content_length == len(body)
+
+
+def test_digest_holds_back_long_runs_across_chunks():
+    body = b"start " + b"x" * (server.WATCH_TOKEN_MAX_CHARS * 2 + 17) + b" end"
+    assert digest(body, 1000).blocks == digest(body, len(body)).blocks
+
+
+@pytest.mark.parametrize("chunk_size", [512, 65536])
+@pytest.mark.parametrize("body", [
+    b"x" * 70000 + b" end",
+    b"<img src='data:image/png;base64," + b"QUJD" * 20000 + b"'> after",
+], ids=["plain-run", "data-uri"])
+def test_digest_streams_long_unbroken_runs_in_linear_time(body, chunk_size):
+    started = time.perf_counter()
+    result = digest(body, chunk_size)
+    assert time.perf_counter() - started < 2
+    assert result.content_hash == server.page_fingerprint(body.decode("utf-8"))
+    assert result.blocks == digest(body, len(body)).blocks
+
+
+def test_digest_folds_overflow_into_last_block(monkeypatch):
+    body = page(5000)
+    uncapped = digest(body, 4096)
+    monkeypatch.setattr(server, "WATCH_DIFF_MAX_BLOCKS", 4)
+    capped = digest(body, 4096)
+    assert len(capped.blocks) == 4
+    assert capped.blocks[:3] == uncapped.blocks[:3]
+    assert sum(length for _, length, _ in capped.blocks) == sum(len(token) + 1 for token in body.split())
+
+
+def test_diff_localizes_an_edit_regardless_of_chunking():
+    before_blocks = digest(page(20000), 4096).blocks
+    after_blocks = digest(page(20000, edit_at=19990), 7).blocks
+    diff = server.diff_fingerprints(before_blocks, after_blocks)
+    assert 0.9 < diff["similarity"] < 1.0
+    assert 1 <= diff["changed_block_count"] <= 2
+    assert all(block["index"] >= len(after_blocks) - 3 for block in diff["changed_blocks"])
+    assert server.diff_fingerprints(before_blocks, before_blocks)["similarity"] == 1.0
+
+
+def test_diff_without_a_previous_fingerprint():
+    assert server.diff_fingerprints(None, [(1, 10, "a")]) is None
+    assert server.diff_fingerprints([], [])["similarity"] == 1.0
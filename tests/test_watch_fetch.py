@@ -0,0 +1,57 @@
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import server
+
+PAGE = b"<html><head><title>Status</title></head><body>All   systems\n operational</body></html>"
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"etag": '"v1"'})
+        return httpx.Response(200, content=PAGE, headers={"etag": '"v1"', "last-modified": "Tue, 01 Sep 2026 10:00:00 GMT"})
+
+    real_client = httpx.AsyncClient
+
+    def client(**kwargs):
+        kwargs.pop("http2", None)
+        kwargs.pop("limits", None)
+        return real_client(transport=httpx.MockTransport(handler), **kwargs)
+
+    monkeypatch.setattr(server.httpx, "AsyncClient", client)
+    monkeypatch.setattr(server, "http_clients", server.HttpClientRegistry())
+    return requests
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_reuses_the_previous_snapshot_on_304(upstream):
+    first = await server.fetch_watch_snapshot("https://status.example.com/")
+    assert "if-none-match" not in upstream[0].headers
+    assert first["status_code"] == 200 and not first["not_modified"]
+    assert first["title"] == "Status"
+    assert first["etag"] == '"v1"'
+
+    second = await server.fetch_watch_snapshot("https://status.example.com/", first)
+    assert upstream[1].headers["if-none-match"] == '"v1"'
+    assert upstream[1].headers["if-modified-since"] == "Tue, 01 Sep 2026 10:00:00 GMT"
+    assert second["not_modified"]
+    assert second["content_hash"] == first["content_hash"]
+    assert second["title"] == "Status" and second["status_code"] == 200
+    assert server.summarize_change(first, second) == "NO_CHANGE"
+
+
+@pytest.mark.asyncio
+async def test_failed_snapshot_does_not_send_validators(upstream):
+    failed = {"ok": False, "status_code": 503, "etag": '"v1"', "content_hash": "stale"}
+    current = await server.fetch_watch_snapshot("https://status.example.com/", failed)
+    assert "if-none-match" not in upstream[0].headers
+    assert current["status_code"] == 200 and not current["not_modified"]
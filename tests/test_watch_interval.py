@@ -0,0 +1,91 @@
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import server
+
+OK = {"ok": True, "status_code": 200}
+
+
+def test_stable_pages_back_off_up_to_the_max():
+    interval = server.WATCH_MIN_INTERVAL_SECONDS
+    for _ in range(50):
+        interval = server.next_watch_interval(interval, OK, OK, False, None, None)
+    assert interval == server.WATCH_MAX_INTERVAL_SECONDS
+    assert server.next_watch_interval(60, OK, OK, False, None, None) == pytest.approx(60 * server.WATCH_BACKOFF_FACTOR)
+
+
+def test_changes_tighten_down_to_the_min():
+    assert server.next_watch_interval(400, OK, OK, True, None, None) == pytest.approx(400 * server.WATCH_TIGHTEN_FACTOR)
+    assert server.next_watch_interval(server.WATCH_MIN_INTERVAL_SECONDS, OK, OK, True, None, None) == server.WATCH_MIN_INTERVAL_SECONDS
+
+
+def test_first_poll_and_failures_keep_the_interval():
+    assert server.next_watch_interval(60, None, OK, False, None, None) == 60
+    assert server.next_watch_interval(60, OK, {"ok": False, "status_code": 503}, False, None, None) == 60
+
+
+def test_cache_headers_set_a_floor():
+    assert server.next_watch_interval(400, OK, OK, True, 300, None) == 300
+    assert server.next_watch_interval(20, OK, OK, True, None, 120) == 120
+    assert server.next_watch_interval(20, OK, OK, False, 10_000, None) == server.WATCH_MAX_INTERVAL_SECONDS
+
+
+def test_parse_cache_headers():
+    assert server.parse_max_age("public, max-age=600") == 600
+    assert server.parse_max_age("s-maxage=10, max-age=\"30\"") == 30
+    assert server.parse_max_age("no-cache, max-age=600") is None
+    assert server.parse_max_age(None) is None
+    assert server.parse_retry_after("120") == 120
+    retry_at = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=90), usegmt=True)
+    assert 80 <= server.parse_retry_after(retry_at) <= 90
+    assert server.parse_retry_after("soon") is None
+
+
+class FakeSocket:
+    def __init__(self):
+        self.messages = []
+
+    async def send_json(self, payload):
+        self.messages.append(payload)
+
+
+def snapshot(content_hash, blocks):
+    return {"ok": True, "status_code": 200, "title": "Status", "content_hash": content_hash,
+            "content_length": 200, "fingerprint": blocks}
+
+
+@pytest.mark.asyncio
+async def test_change_held_by_cooldown_backs_off_and_is_announced_once(monkeypatch):
+    polls = iter([snapshot("a", [(1, 100, "a1"), (2, 100, "a2")])] + [snapshot("b", [(3, 100, "b1"), (4, 100, "b2")]) for _ in range(4)])
+
+    async def fake_fetch(url, previous=None):
+        return next(polls)
+
+    async def fake_research(target, current, reason, summary):
+        return None
+
+    monkeypatch.setattr(server, "fetch_watch_snapshot", fake_fetch)
+    monkeypatch.setattr(server, "watch_store", server.WatchStateStore(""))
+    scheduler = server.WatchScheduler()
+    monkeypatch.setattr(scheduler, "_research", fake_research)
+    target = server.WatchTarget("https://status.example.com/")
+    socket = FakeSocket()
+    target.subscribers.add(socket)
+
+    intervals = []
+    for _ in range(5):
+        await scheduler._check(target)
+        await asyncio.sleep(0)
+        intervals.append(target.interval)
+    # Baseline, then one change inside the cooldown, then the same held-back change on three more polls.
+    assert intervals[1] < intervals[0]
+    assert intervals[2] > intervals[1] and intervals[4] > intervals[3] > intervals[2]
+    cooldowns = [m for m in socket.messages if "REPORT_COOLDOWN" in m.get("message", "")]
+    assert len(cooldowns) == 1
+    assert target.fingerprint_hash == "a"
@@ -0,0 +1,50 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import server
+
+
+@pytest.mark.asyncio
+async def test_watch_state_round_trips_through_sqlite(tmp_path):
+    path = str(tmp_path / "watch_state.db")
+    store = server.WatchStateStore(path)
+    await store.open()
+    target = server.WatchTarget("https://status.example.com/")
+    target.previous = {"status_code": 200, "ok": True, "content_hash": "abc123", "title": "Status"}
+    target.baseline_reported = True
+    target.last_researched_signature = "baseline:200:abc123:Status"
+    target.last_research_at = 1_790_000_000
+    target.fingerprint = [(3141592653, 120, "All systems operational"), (2718281828, 64, "Incident history")]
+    target.fingerprint_hash = "abc123"
+    store.save(target.url, target.to_state())
+    store.save("https://gone.example.com/", {"previous": None})
+    store.save_report(target.url, {"query": "q", "reason": "baseline", "img_data": "", "sources": []})
+    await store.flush()
+    store.forget("https://gone.example.com/")
+    await store.close()
+
+    reopened = server.WatchStateStore(path)
+    await reopened.open()
+    assert set(reopened.states) == {target.url}
+    restored = server.WatchTarget(target.url)
+    restored.restore(reopened.states[target.url])
+    assert restored.to_state() == target.to_state()
+    assert restored.fingerprint == target.fingerprint
+    assert (await reopened.load_report(target.url))["reason"] == "baseline"
+    assert await reopened.load_report("https://gone.example.com/") is None
+    assert reopened.snapshot()["restored"] == 1
+    await reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_watch_state_store_is_optional():
+    store = server.WatchStateStore("")
+    await store.open()
+    store.save("https://status.example.com/", {"previous": None})
+    await store.flush()
+    assert not store.snapshot()["enabled"]
+    assert await store.load_report("https://status.example.com/") is None
+    await store.close()